@@ -1,8 +1,13 @@
-import re
+import argparse
+import multiprocessing
 import pandas as pd
 from tkinter import Frame, StringVar, Tk, Button, Label, ttk, BooleanVar, Checkbutton
 from tkinter.filedialog import askopenfilename, asksaveasfilename
 from tkinter.messagebox import showerror, showinfo
+from common import ALL_SHEETS, INDICATOR_FORMATS, benchmark_split, expand_columns, load_sheet, split_cell, write_sheets
+
+# Separator between the options of a multiple-response cell
+DELIMITER = ";"
 
 
 # Function to open a file dialog for selecting the input file
@@ -25,10 +30,16 @@ def select_output_file(default_name="output.xlsx"):
     )  # Return the default if no file selected
 
 
-def process_file(input_file, output_file, cols_to_skip, keep_original_columns, sheet_name):
+def process_file(input_file, output_file, cols_to_skip, keep_original_columns, sheet_name, indicator_format="Yes/No", parallel=False, top_k="", min_support=""):
+    # Cached splits are only useful within one run
+    split_cell.cache_clear()
     try:
+        if indicator_format not in INDICATOR_FORMATS:
+            showerror("Error", f"Indicator values must be one of: {', '.join(INDICATOR_FORMATS)}.")
+            return
+
         # Load the Excel file
-        df = pd.read_excel(input_file, sheet_name=sheet_name)
+        df = load_sheet(input_file, sheet_name)
 
         try:
             cols_to_skip = [int(col.strip()) - 1 for col in cols_to_skip if col.strip()]
@@ -36,6 +47,16 @@ def process_file(input_file, output_file, cols_to_skip, keep_original_columns, s
             showerror("Error", "Columns to skip must be integers.")
             return
         
+        try:
+            top_k = int(top_k) if str(top_k).strip() else None
+            min_support = int(min_support) if str(min_support).strip() else None
+            # Keeping no options, or a negative number of them, is not a cap
+            if (top_k is not None and top_k < 1) or (min_support is not None and min_support < 0):
+                raise ValueError
+        except ValueError:
+            showerror("Error", "Top options must be an integer of at least 1 and minimum responses an integer of at least 0.")
+            return
+
         # Ensure we do not have duplicates and sort
         cols_to_skip = list(sorted(set(cols_to_skip)))
         
@@ -48,78 +69,15 @@ def process_file(input_file, output_file, cols_to_skip, keep_original_columns, s
         # Columns to process
         columns_to_process = [col for col in df.columns if col not in skipped_columns]
 
-        # Function to split by commas outside of brackets
-        def split_outside_brackets(text):
-            if isinstance(text, str):
-                parts = re.split(r";(?![^\(\[]*[\)\]])", text)
-                return [part.strip() for part in parts]
-            return []
-
-        # Identify columns with multiple responses
-        columns_with_multiple_responses = [
-            col
-            for col in columns_to_process
-            if df[col]
-            .apply(lambda x: isinstance(x, str) and len(split_outside_brackets(x)) > 1)
-            .any()
-        ]
-
-        # Store the original columns to drop them later
-        original_columns = []
-
-        # Process each column with multiple responses
-        for col in columns_with_multiple_responses:
-            # Get unique responses across all rows, including None values
-            unique_responses = []
-            df[col].dropna().apply(
-                lambda x: [
-                    unique_responses.append(resp)
-                    for resp in split_outside_brackets(x)
-                    if resp not in unique_responses
-                ]
-            )
-
-            # Create new columns for each unique response
-            new_columns = {}
-            for response in unique_responses:
-                new_col_name = response.strip()
-
-                # Ensure the new column name is unique
-                if new_col_name in df.columns:
-                    suffix = 1
-                    while f"{new_col_name}_{suffix}" in df.columns:
-                        suffix += 1
-                    new_col_name = f"{new_col_name}_{suffix}"
-
-                # Create the new column data
-                new_columns[new_col_name] = df[col].apply(
-                    lambda x: (
-                        "Yes"
-                        if isinstance(x, str) and response in split_outside_brackets(x)
-                        else "No"
-                    )
-                )
-
-            # Insert new columns right after the original column
-            col_index = df.columns.get_loc(col)
-            for new_col_name, new_col_data in new_columns.items():
-                col_index += 1
-                df.insert(col_index, new_col_name, new_col_data)
-
-            # Add the original column to the list to be dropped
-            original_columns.append(col)
-
-        # Drop the original columns if the option is selected
-        if not keep_original_columns:
-            df.drop(columns=original_columns, inplace=True)
-
-        # Re-add the skipped columns back to the DataFrame
-        for col in skipped_columns:
-            df[col] = pd.read_excel(input_file, sheet_name=sheet_name, usecols=[col])[col]
+        # Expand every multiple-response column into indicator columns
+        df = expand_columns(
+            df, columns_to_process, DELIMITER, indicator_format, keep_original_columns, parallel, top_k, min_support
+        )
 
         # Try to save the standardized DataFrame to a new Excel file
         try:
-            df.to_excel(output_file, index=False)
+            # Rows past one sheet continue on the next one
+            write_sheets(df, output_file)
             showinfo("Success", f"Updated DataFrame saved to {output_file}")
         except PermissionError:
             showerror(
@@ -139,6 +97,10 @@ def main():
     output_file = None
     sheet_name = StringVar()
     keep_columns_var = BooleanVar()
+    indicator_format = StringVar(value=INDICATOR_FORMATS[0])
+    parallel_var = BooleanVar()
+    top_k = StringVar()
+    min_support = StringVar()
     cols_to_skip = StringVar()
 
     def load_input_file():
@@ -148,7 +110,7 @@ def main():
             input_label.config(text=f"Input File: {input_file}")
             # Populate sheet dropdown
             sheet_names = pd.ExcelFile(input_file).sheet_names
-            sheet_dropdown["values"] = sheet_names
+            sheet_dropdown["values"] = sheet_names + ([ALL_SHEETS] if len(sheet_names) > 1 else [])
             if sheet_names:
                 sheet_dropdown.set(sheet_names[0])  # Set default to the first sheet
 
@@ -167,7 +129,10 @@ def main():
             return
         
         cols_to_skip_list = [col.strip() for col in cols_to_skip.get().split(",") if col.strip()]
-        process_file(input_file, output_file, cols_to_skip_list, keep_columns_var.get(), sheet_name.get())
+        process_file(
+            input_file, output_file, cols_to_skip_list, keep_columns_var.get(), sheet_name.get(), indicator_format.get(),
+            parallel_var.get(), top_k.get(), min_support.get(),
+        )
 
     # Create a frame to contain all widgets and add padding to the frame
     main_frame = Frame(root, padx=20, pady=20)
@@ -210,6 +175,27 @@ def main():
     )
     keep_columns_checkbox.pack(pady=10)
 
+    Label(main_frame, text="Indicator Values:").pack(pady=5)
+    indicator_dropdown = ttk.Combobox(
+        main_frame, textvariable=indicator_format, values=INDICATOR_FORMATS, state="readonly"
+    )
+    indicator_dropdown.pack(pady=5)
+
+    # Checkbox for spreading the column expansion over all CPU cores
+    parallel_checkbox = Checkbutton(
+        main_frame, text="Use All CPU Cores", variable=parallel_var
+    )
+    parallel_checkbox.pack(pady=10)
+
+    # Limits for collapsing rare options into a single "Other" column
+    Label(main_frame, text="Keep Top Options per Question (blank = all):").pack(pady=5)
+    top_k_entry = ttk.Entry(main_frame, textvariable=top_k)
+    top_k_entry.pack(pady=5)
+
+    Label(main_frame, text="Minimum Responses per Option (blank = any):").pack(pady=5)
+    min_support_entry = ttk.Entry(main_frame, textvariable=min_support)
+    min_support_entry.pack(pady=5)
+
     Button(
         main_frame,
         text="Process File",
@@ -223,4 +209,13 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    # Needed for the process pool when running as a frozen executable
+    multiprocessing.freeze_support()
+
+    parser = argparse.ArgumentParser(description="Excel Response Standardizer")
+    parser.add_argument("--benchmark", action="store_true", help="Time the response splitter on cells of 1 KB to 100 KB")
+    args = parser.parse_args()
+    if args.benchmark:
+        benchmark_split(DELIMITER)
+    else:
+        main()
@@ -1,9 +1,15 @@
+import os
 import re
 import numpy as np
 import pandas as pd
-from tkinter import Frame, StringVar, Tk, Button, Label, ttk
+from pandas.api.types import is_bool_dtype, is_datetime64_any_dtype, is_numeric_dtype
+from tkinter import BooleanVar, Checkbutton, Frame, StringVar, Tk, Button, Label, ttk
 from tkinter.filedialog import askopenfilename, asksaveasfilename
-from tkinter.messagebox import showerror, showinfo
+from tkinter.messagebox import showerror, showinfo, showwarning
+from common import (
+    ALL_SHEETS, NORMALIZATION_STEPS, codebook_path, load_codebook, normalize_response, read_sheet,
+    response_key, save_codebook,
+)
 
 def select_input_file():
     return askopenfilename(
@@ -20,9 +26,114 @@ def select_output_file(default_name="mapping.xlsx"):
     )
     return file_path if file_path else default_name
 
-def process_file(input_file, output_file, cols_to_skip, sheet_name):
+# Text that pd.to_numeric accepts as a plain number
+NUMBER_PATTERN = r"[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?"
+
+# Values checked before a full pass over an object column
+NUMERIC_SAMPLE_SIZE = 500
+
+def is_numeric_column(column):
+    """Check if a column contains only numbers (integers or floats).
+
+    Numeric, boolean and datetime dtypes are accepted straight away. Other
+    columns are matched against NUMBER_PATTERN on an evenly spaced sample
+    first, and only verified in full when the whole sample looks numeric.
+    """
+    if is_numeric_dtype(column) or is_bool_dtype(column) or is_datetime64_any_dtype(column):
+        return True
+
+    values = column.dropna()
+    if values.empty:
+        return True
+    if len(values) > NUMERIC_SAMPLE_SIZE:
+        sample = values.iloc[np.linspace(0, len(values) - 1, NUMERIC_SAMPLE_SIZE, dtype=np.intp)]
+        if not sample.astype(str).str.strip().str.fullmatch(NUMBER_PATTERN).all():
+            return False
+    return bool(values.astype(str).str.strip().str.fullmatch(NUMBER_PATTERN).all())
+
+def profile_columns(df):
+    """Return 'numeric' or 'text' for each column, in column order."""
+    return {col: "numeric" if is_numeric_column(df[col]) else "text" for col in df.columns}
+
+def create_mapping(column, steps=()):
+    """Return the response to number mapping of one column, without modifying it.
+
+    With normalization steps, responses that normalize to the same key share
+    the code of the first one seen, which is kept as the displayed response.
+    """
+    # Strip each distinct raw value once instead of every cell
+    stripped_responses = pd.Series(pd.unique(column), dtype=object).astype(str).str.strip()
+
+    # Handle 'nan' as actual NaN values and get unique non-null responses
+    unique_responses = pd.unique(stripped_responses[stripped_responses != 'nan'].dropna())
+
+    # Start with predefined mappings
+    response_mapping = {'Yes': 1, 'No': 0}
+    seen = {response_key(response, steps) for response in response_mapping}
+
+    # Enumerate starting from 1 for new responses
+    current_index = 1
+    for response in unique_responses:
+        # Skip if response is empty or already in the mapping
+        key = response_key(response, steps)
+        if key not in seen and response != '':
+            seen.add(key)
+            response_mapping[response] = current_index
+            current_index += 1
+
+    return response_mapping
+
+def codebook_entry(mapping):
+    return pd.Series(list(mapping.values()), index=pd.Index(list(mapping.keys()), dtype=object))
+
+def build_codebook(df, columns, steps=()):
+    """Return a codebook with one entry per column, keyed by the column name as text.
+
+    Each entry is a Series of numbers indexed by response, so its index can be
+    used directly as Categorical categories and the numbers taken by code.
+    """
+    return {str(column): codebook_entry(create_mapping(df[column], steps)) for column in columns}
+
+def extend_codebook(df, columns, codebook, first_row, steps=()):
+    """Add codes for responses not seen before, keeping every existing code.
+
+    Only rows from first_row on are scanned for columns already in the
+    codebook; new columns are scanned in full. Unseen responses get numbers
+    after the column's current maximum. Returns the names of changed columns.
+    """
+    changed = []
+    for column in columns:
+        name = str(column)
+        if name not in codebook:
+            codebook[name] = codebook_entry(create_mapping(df[column], steps))
+            changed.append(name)
+            continue
+
+        entry = codebook[name]
+        known = {response_key(response, steps) for response in entry.index}
+        new_responses = [
+            response for response in create_mapping(df[column].iloc[first_row:], steps)
+            if response_key(response, steps) not in known
+        ]
+        if new_responses:
+            start = int(entry.max()) + 1 if len(entry) else 1
+            new_entry = pd.Series(range(start, start + len(new_responses)), index=pd.Index(new_responses, dtype=object))
+            codebook[name] = pd.concat([entry, new_entry])
+            changed.append(name)
+    return changed
+
+def flatten_codebook(codebook):
+    """Merge the per-column codebook into one dict; later columns win on shared responses."""
+    all_mappings = {}
+    for entry in codebook.values():
+        all_mappings.update(zip(entry.index, entry.tolist()))
+    return all_mappings
+
+def process_file(input_file, output_file, cols_to_skip, sheet_name, incremental=False, normalize=False):
+    # Normalized strings are only cached for one run
+    normalize_response.cache_clear()
     try:
-        df = pd.read_excel(input_file, sheet_name=sheet_name)
+        df = read_sheet(input_file, sheet_name)
 
         try:
             cols_to_skip = [int(col.strip()) - 1 for col in cols_to_skip if col.strip()]
@@ -30,16 +141,9 @@ def process_file(input_file, output_file, cols_to_skip, sheet_name):
             showerror("Error", "Columns to skip must be integers.")
             return
 
-        # Function to check if a column contains only numbers (integers or floats)
-        def is_numeric_column(column):
-            try:
-                pd.to_numeric(column, errors='raise')
-                return True
-            except ValueError:
-                return False
-
         # Identify columns that contain only numbers
-        numeric_columns = [i for i, col in enumerate(df.columns) if is_numeric_column(df.iloc[:, i])]
+        column_profile = profile_columns(df)
+        numeric_columns = [i for i, kind in enumerate(column_profile.values()) if kind == "numeric"]
         
         # Update cols_to_skip to include numeric columns
         cols_to_skip.extend(numeric_columns)
@@ -50,49 +154,42 @@ def process_file(input_file, output_file, cols_to_skip, sheet_name):
         max_index = len(df.columns) - 1
         cols_to_skip = [i for i in cols_to_skip if 0 <= i <= max_index]
 
-        df = df.drop(df.columns[cols_to_skip], axis=1, errors='ignore')
+        columns_to_map = [col for i, col in enumerate(df.columns) if i not in cols_to_skip]
 
-        def create_mapping(column):
-            stripped_responses = column.astype(str).str.strip()
-
-            # Handle 'nan' as actual NaN values
-            stripped_responses = stripped_responses.replace('nan', np.nan)
-            
-            # Get unique non-null responses
-            unique_responses = pd.unique(stripped_responses.dropna())
-
-            # Start with predefined mappings
-            response_mapping = {'Yes': 1, 'No': 0}
-
-            # Enumerate starting from 1 for new responses
-            current_index = 1
-            for response in unique_responses:
-                # Skip if response is empty or already in the mapping
-                if response not in response_mapping and response != '':
-                    response_mapping[response] = current_index
-                    current_index += 1
-
-            return response_mapping
-        
-        def convert_column(column, mapping):
-            stripped_column = column.astype(str).str.strip()
-            return stripped_column.map(lambda x: mapping.get(x, x) if x != '' else x)
-
-        all_mappings = {}
-
-        for column in df.columns:
-            # Create mapping for each column
-            mapping = create_mapping(df[column])
-            df[column] = convert_column(df[column], mapping)
-            
-            # Add column-specific mappings to all_mappings
-            all_mappings.update(mapping)
+        # Build the codebook from the remaining columns without changing df
+        saved = None
+        if incremental and os.path.exists(codebook_path(output_file)):
+            # Keep matching responses the way the existing codebook was built
+            saved = load_codebook(
+                output_file,
+                lambda: showwarning(
+                    "Warning",
+                    "The mapping file was edited after its codebook was saved. The codes are built again from the responses.",
+                ),
+            )
+        if saved is not None and saved.columns:
+            codebook, version, steps = saved.columns, saved.version, saved.steps
+            column_versions, column_created = saved.column_versions, saved.column_created
+            # Rescan everything if the sheet is shorter than last time
+            first_row = saved.rows if saved.rows <= len(df) else 0
+            added = [str(column) for column in columns_to_map if str(column) not in codebook]
+            changed = extend_codebook(df, columns_to_map, codebook, first_row, steps)
+            if changed:
+                version += 1
+                column_versions.update({column: version for column in changed})
+                column_created.update({column: version for column in added})
+        else:
+            steps = NORMALIZATION_STEPS if normalize else ()
+            codebook = build_codebook(df, columns_to_map, steps)
+            version, column_versions, column_created = 1, None, None
+        all_mappings = flatten_codebook(codebook)
 
         # Create DataFrame for mappings
         mapping_df = pd.DataFrame(list(all_mappings.items()), columns=["Value", "Number"])
 
         try:
             mapping_df.to_excel(output_file, header=False, index=False)
+            save_codebook(codebook, output_file, version, len(df), column_versions, steps, column_created)
             showinfo("Success", f"Mappings saved to {output_file}")
         except PermissionError:
             showerror("Error", "The output file is currently open. Please close it before saving.")
@@ -108,6 +205,8 @@ def main():
     output_file = None
     sheet_name = StringVar()
     cols_to_skip = StringVar()
+    incremental_var = BooleanVar()
+    normalize_var = BooleanVar()
 
     def load_input_file():
         nonlocal input_file
@@ -115,7 +214,7 @@ def main():
         if input_file:
             input_label.config(text=f"Input File: {input_file}")
             sheet_names = pd.ExcelFile(input_file).sheet_names
-            sheet_dropdown["values"] = sheet_names
+            sheet_dropdown["values"] = sheet_names + ([ALL_SHEETS] if len(sheet_names) > 1 else [])
             if sheet_names:
                 sheet_dropdown.set(sheet_names[0])
 
@@ -137,7 +236,7 @@ def main():
             return
         
         cols_to_skip_list = [col.strip() for col in cols_to_skip.get().split(",") if col.strip()]
-        process_file(input_file, output_file, cols_to_skip_list, sheet_name.get())
+        process_file(input_file, output_file, cols_to_skip_list, sheet_name.get(), incremental_var.get(), normalize_var.get())
 
     main_frame = Frame(root, padx=20, pady=20)
     main_frame.pack(padx=10, pady=10)
@@ -172,6 +271,18 @@ def main():
     cols_to_skip_entry = ttk.Entry(main_frame, textvariable=cols_to_skip)
     cols_to_skip_entry.pack(pady=5)
 
+    # Checkbox for extending the codebook saved with the output file
+    incremental_checkbox = Checkbutton(
+        main_frame, text="Extend Existing Mapping (keep codes)", variable=incremental_var
+    )
+    incremental_checkbox.pack(pady=10)
+
+    # Checkbox for matching responses regardless of case, spacing and quote style
+    normalize_checkbox = Checkbutton(
+        main_frame, text="Normalize Responses (case, spaces, quotes)", variable=normalize_var
+    )
+    normalize_checkbox.pack(pady=10)
+
     Button(
         main_frame,
         text="Process File",
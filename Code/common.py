@@ -0,0 +1,599 @@
+"""Helpers shared by the form processing scripts: sheet reading, response
+normalization, the mapping file and its per-column codebook, and the
+expansion of multiple-response columns."""
+import hashlib
+import json
+import marshal
+import os
+import pickle
+import re
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import repeat
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_object_dtype, is_string_dtype
+
+# Dropdown entry that reads every sheet of a sharded workbook as one table
+ALL_SHEETS = "All Sheets"
+
+def read_sheet(input_file, sheet_name, **kwargs):
+    """Read one sheet, or every sheet stacked in order when ALL_SHEETS is selected."""
+    if sheet_name == ALL_SHEETS:
+        sheets = pd.read_excel(input_file, sheet_name=None, **kwargs)
+        return pd.concat(sheets.values(), ignore_index=True)
+    return pd.read_excel(input_file, sheet_name=sheet_name, **kwargs)
+
+# Maximum number of rows in an Excel sheet, including the header
+EXCEL_MAX_ROWS = 1048576
+
+def write_sheets(df, output_file, max_rows=None):
+    """Write the frame to Excel, continuing on Sheet2, Sheet3, ... past one sheet.
+
+    Each sheet holds at most max_rows data rows (default: as many as Excel
+    allows) below a copy of the header, so the output can be read back as one
+    table with ALL_SHEETS. A frame that fits is written exactly like to_excel.
+    """
+    max_rows = max_rows or EXCEL_MAX_ROWS - 1
+    with pd.ExcelWriter(output_file) as writer:
+        for sheet_index, start in enumerate(range(0, max(len(df), 1), max_rows), start=1):
+            df.iloc[start:start + max_rows].to_excel(writer, sheet_name=f"Sheet{sheet_index}", index=False)
+
+# Stripped sheets keyed by (path, sheet name, modification time)
+CLEAN_CACHE = {}
+
+# Stripped sheets shared between the separate programs, kept per user rather
+# than next to the workbook because they are pickled
+CLEAN_CACHE_DIR = os.path.join(
+    os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache"), "FormTools", "clean"
+)
+
+def strip_column(column):
+    """Strip whitespace from the strings of a text column, once per distinct value."""
+    if not (is_object_dtype(column) or is_string_dtype(column)):
+        return column
+    codes, uniques = pd.factorize(column)
+    if len(uniques) == 0:
+        return column  # Every cell is blank
+    uniques = pd.Series(uniques, dtype=object)
+    # .str.strip() gives NaN for non-string values, which are kept as they are
+    stripped = uniques.str.strip()
+    stripped = stripped.where(stripped.notna(), uniques).to_numpy(dtype=object)
+    values = column.to_numpy(dtype=object)
+    return pd.Series(np.where(codes >= 0, stripped.take(codes, mode="clip"), values), index=column.index)
+
+def clean_cache_path(input_file, sheet_name):
+    """Path of the on-disk copy of a cleaned sheet in the user's cache directory."""
+    name = hashlib.sha256(f"{os.path.abspath(input_file)}\0{sheet_name}".encode("utf-8")).hexdigest()
+    return os.path.join(CLEAN_CACHE_DIR, name + ".pkl")
+
+def read_clean_cache(input_file, sheet_name, stat):
+    """Return the cleaned sheet saved by an earlier run if it still matches the Excel file, else None."""
+    cache_path = clean_cache_path(input_file, sheet_name)
+    try:
+        with open(cache_path, "rb") as file:
+            header = pickle.load(file)
+            if header["path"] != os.path.abspath(input_file) or header["sheet"] != sheet_name:
+                return None
+            if header["mtime"] != stat.st_mtime_ns or header["size"] != stat.st_size:
+                # Touched but possibly unchanged: compare contents before cleaning again
+                if header["sha256"] != file_digest(input_file):
+                    return None
+                responses_df = pickle.load(file)
+                write_clean_cache(input_file, sheet_name, stat, responses_df, header["sha256"])
+                return responses_df
+            return pickle.load(file)
+    except (OSError, EOFError, ValueError, TypeError, KeyError, AttributeError, ImportError, pickle.UnpicklingError):
+        return None
+
+def write_clean_cache(input_file, sheet_name, stat, responses_df, digest=None):
+    """Save the cleaned sheet for the next step, replacing the one saved before."""
+    header = {
+        "path": os.path.abspath(input_file),
+        "sheet": sheet_name,
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": digest or file_digest(input_file),
+    }
+    cache_path = clean_cache_path(input_file, sheet_name)
+    try:
+        os.makedirs(CLEAN_CACHE_DIR, exist_ok=True)
+        # Only keep the most recent sheet on disk
+        for name in os.listdir(CLEAN_CACHE_DIR):
+            if os.path.join(CLEAN_CACHE_DIR, name) != cache_path:
+                os.remove(os.path.join(CLEAN_CACHE_DIR, name))
+        with open(cache_path + ".tmp", "wb") as file:
+            pickle.dump(header, file, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(responses_df, file, pickle.HIGHEST_PROTOCOL)
+        os.replace(cache_path + ".tmp", cache_path)
+    except (OSError, pickle.PicklingError):
+        pass
+
+def load_clean_sheet(input_file, sheet_name):
+    """Load the sheet with whitespace stripped from its text columns.
+
+    The cleaned frame is cached in memory and in the user's cache directory,
+    so the next step on the same unchanged sheet (formToNumber, then
+    formToSPSS) skips both reading and cleaning. Callers must copy it before
+    modifying it.
+    """
+    stat = os.stat(input_file)
+    key = (os.path.abspath(input_file), sheet_name, stat.st_mtime_ns)
+    if key not in CLEAN_CACHE:
+        responses_df = read_clean_cache(input_file, sheet_name, stat)
+        if responses_df is None:
+            responses_df = read_sheet(input_file, sheet_name)
+            for i in range(responses_df.shape[1]):
+                responses_df.isetitem(i, strip_column(responses_df.iloc[:, i]))
+            write_clean_cache(input_file, sheet_name, stat, responses_df)
+        # Only keep the most recent sheet in memory
+        CLEAN_CACHE.clear()
+        CLEAN_CACHE[key] = responses_df
+    return CLEAN_CACHE[key]
+
+# Normalization steps applied before responses are compared
+NORMALIZATION_STEPS = ("nfc", "spaces", "quotes", "casefold")
+
+SMART_QUOTES = str.maketrans({
+    "‘": "'", "’": "'", "‚": "'", "‛": "'",
+    "“": '"', "”": '"', "„": '"', "‟": '"',
+})
+
+@lru_cache(maxsize=None)
+def normalize_response(text, steps=NORMALIZATION_STEPS):
+    """Return the comparison key of a response text.
+
+    Steps are Unicode NFC, collapsing all whitespace (including non-breaking
+    spaces) to single spaces, folding smart quotes and case folding. Results are
+    cached, so each distinct raw string is only normalized once per run.
+    """
+    if "nfc" in steps:
+        text = unicodedata.normalize("NFC", text)
+    text = " ".join(text.split()) if "spaces" in steps else text.strip()
+    if "quotes" in steps:
+        text = text.translate(SMART_QUOTES)
+    if "casefold" in steps:
+        text = text.casefold()
+    return text
+
+def response_key(response, steps):
+    """Key used to match a response: normalized text when steps are set, else the value itself."""
+    if steps and isinstance(response, str):
+        return normalize_response(response, steps)
+    return response
+
+# Compiled copy of the mapping kept next to the Excel file
+MAPPING_CACHE_SUFFIX = ".mapcache"
+
+def file_digest(file_path):
+    """Return the SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def read_mapping_cache(file_path, stat):
+    """Return the cached mapping if it still matches the Excel file, else None."""
+    try:
+        with open(file_path + MAPPING_CACHE_SUFFIX, "rb") as file:
+            header, mapping = marshal.loads(file.read())
+        if header["path"] != os.path.abspath(file_path):
+            return None
+        if header["mtime"] == stat.st_mtime_ns and header["size"] == stat.st_size:
+            return mapping
+        # Touched but possibly unchanged: compare contents before rebuilding
+        if header["sha256"] == file_digest(file_path):
+            write_mapping_cache(file_path, stat, mapping, header["sha256"])
+            return mapping
+    except (OSError, EOFError, ValueError, TypeError, KeyError):
+        pass
+    return None
+
+def write_mapping_cache(file_path, stat, mapping, digest=None):
+    """Save the mapping as a compiled sidecar; mappings that cannot be compiled are skipped."""
+    header = {
+        "path": os.path.abspath(file_path),
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": digest or file_digest(file_path),
+    }
+    cache_path = file_path + MAPPING_CACHE_SUFFIX
+    try:
+        data = marshal.dumps((header, mapping))
+        with open(cache_path + ".tmp", "wb") as file:
+            file.write(data)
+        os.replace(cache_path + ".tmp", cache_path)
+    except (OSError, ValueError):
+        pass
+
+def load_mapping(file_path):
+    """Load mapping from the Excel file into a dictionary."""
+    stat = os.stat(file_path)
+    mapping = read_mapping_cache(file_path, stat)
+    if mapping is not None:
+        return mapping
+    mapping_df = pd.read_excel(file_path, header=None)
+    if mapping_df.shape[1] != 2:
+        raise ValueError("Mapping file must have exactly two columns.")
+    mapping = dict(zip(mapping_df[0], mapping_df[1]))
+    write_mapping_cache(file_path, stat, mapping)
+    return mapping
+
+def codebook_path(mapping_file):
+    """Path of the per-column codebook saved next to a mapping file."""
+    return os.path.splitext(mapping_file)[0] + ".codebook.json"
+
+def file_stamp(file_path):
+    """Return the modification time, size and SHA-256 identifying a file's current contents."""
+    stat = os.stat(file_path)
+    return {"mtime": stat.st_mtime_ns, "size": stat.st_size, "sha256": file_digest(file_path)}
+
+def file_changed(file_path, stamp):
+    """Return True when the file no longer has the contents recorded in stamp."""
+    stat = os.stat(file_path)
+    if stamp["mtime"] == stat.st_mtime_ns and stamp["size"] == stat.st_size:
+        return False
+    return stamp["sha256"] != file_digest(file_path)
+
+def save_codebook(codebook, mapping_file, version=1, rows=0, column_versions=None, steps=(), column_created=None):
+    """Save the codebook next to the mapping file as JSON: per column, the responses and their numbers in category order.
+
+    version is bumped on every change, rows is the number of data rows scanned
+    so far, and each column records the versions in which it was added and last changed.
+    The normalization steps are saved so later steps match responses the same way,
+    and the stamp of the mapping file (saved first) shows whether it was edited since.
+    """
+    column_versions = column_versions or {}
+    column_created = column_created or {}
+    columns = {
+        column: {
+            "values": entry.index.tolist(),
+            "numbers": entry.tolist(),
+            "version": column_versions.get(column, version),
+            "created": column_created.get(column, version),
+        }
+        for column, entry in codebook.items()
+    }
+    with open(codebook_path(mapping_file), 'w', encoding='utf-8') as file:
+        json.dump(
+            {
+                "version": version,
+                "rows": rows,
+                "normalization": list(steps),
+                "mapping": file_stamp(mapping_file),
+                "columns": columns,
+            },
+            file,
+            ensure_ascii=False,
+        )
+
+@dataclass(slots=True)
+class Codebook:
+    """A codebook sidecar as loaded by load_codebook.
+
+    columns maps each column name to a Series of numbers indexed by response;
+    it is empty when there is no usable codebook. column_versions and
+    column_created give the versions in which each column last changed and was added.
+    """
+    columns: dict = field(default_factory=dict)
+    version: int = 1
+    rows: int = 0
+    column_versions: dict = field(default_factory=dict)
+    steps: tuple = ()
+    column_created: dict = field(default_factory=dict)
+
+def load_codebook(mapping_file, on_stale=None):
+    """Load the per-column codebook saved next to the mapping file, if there is one.
+
+    Returns a Codebook, with no columns when the sidecar does not exist. A
+    codebook is also ignored, as if there were none, when the mapping file was
+    edited after it was saved; on_stale is then called so the user can be told.
+    """
+    file_path = codebook_path(mapping_file)
+    if not os.path.exists(file_path):
+        return Codebook()
+    with open(file_path, 'r', encoding='utf-8') as file:
+        data = json.load(file)
+    # Codebooks saved before the stamp was recorded cannot be checked
+    if "mapping" in data and file_changed(mapping_file, data["mapping"]):
+        if on_stale:
+            on_stale()
+        return Codebook()
+    return Codebook(
+        columns={
+            column: pd.Series(entry["numbers"], index=pd.Index(entry["values"], dtype=object))
+            for column, entry in data["columns"].items()
+        },
+        version=data.get("version", 1),
+        rows=data.get("rows", 0),
+        column_versions={column: entry.get("version", 1) for column, entry in data["columns"].items()},
+        steps=tuple(data.get("normalization", ())),
+        column_created={column: entry.get("created", 1) for column, entry in data["columns"].items()},
+    )
+
+# Ways to write the new indicator columns: text, uint8, or sparse uint8
+INDICATOR_FORMATS = ("Yes/No", "1/0", "1/0 (sparse)")
+
+@lru_cache(maxsize=None)
+def token_pattern(delimiter):
+    """Regex matching only the characters the tokenizer has to look at."""
+    return re.compile(r"[()\[\]]|" + re.escape(delimiter))
+
+@lru_cache(maxsize=None)
+def split_cell(text, delimiter):
+    """Split text on the delimiter outside of brackets, in a single pass.
+
+    Bracket depth is tracked while scanning, so a delimiter inside "(...)" or
+    "[...]" stays part of its option. Results are cached per distinct cell value.
+    """
+    parts = []
+    depth = 0
+    start = 0
+    for match in token_pattern(delimiter).finditer(text):
+        char = match.group()
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth = max(depth - 1, 0)
+        elif depth == 0:
+            parts.append(text[start:match.start()].strip())
+            start = match.end()
+    parts.append(text[start:].strip())
+    return tuple(parts)
+
+def split_outside_brackets(text, delimiter):
+    """Split a cell on the delimiter outside of brackets; non-text cells have no options."""
+    if isinstance(text, str):
+        return split_cell(text, delimiter)
+    return ()
+
+def encode_uniques(uniques, delimiter):
+    """Tokenize the distinct cells of a column once.
+
+    Returns the options in order of first appearance, plus parallel arrays of
+    (distinct cell, option ID) pairs. Only the distinct values go in and only
+    these small arrays come out, so this is cheap to run in a worker process.
+    """
+    option_ids = {}
+    unique_index = []
+    option_index = []
+    for unique_id, value in enumerate(uniques):
+        for response in split_outside_brackets(value, delimiter):
+            unique_index.append(unique_id)
+            option_index.append(option_ids.setdefault(response, len(option_ids)))
+    return list(option_ids), np.array(unique_index, dtype=np.intp), np.array(option_index, dtype=np.intp)
+
+def build_indicators(codes, unique_count, option_count, unique_index, option_index):
+    """Broadcast the indicator rows of the distinct cells to every row with one NumPy take."""
+    # One extra all-zero row so missing cells (code -1) take no options
+    unique_indicators = np.zeros((unique_count + 1, option_count), dtype=np.uint8)
+    unique_indicators[unique_index, option_index] = 1
+    return unique_indicators.take(codes, axis=0)
+
+def cap_options(options, codes, uniques, unique_index, option_index, delimiter, top_k=None, min_support=None):
+    """Keep the most frequent options and collapse the rest into one "Other" option.
+
+    Option frequencies are row counts derived from the tokenization pass, with
+    no re-splitting. An option is kept if it is among the top_k and has at least
+    min_support responses (either limit may be None). Returns the new option
+    list, the remapped option indices, and per distinct cell the collapsed
+    responses joined as text (None when nothing was collapsed).
+    """
+    option_count = len(options)
+    unique_rows = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    frequency = np.bincount(option_index, weights=unique_rows[unique_index], minlength=option_count)
+
+    keep = np.ones(option_count, dtype=bool)
+    if top_k is not None and top_k < option_count:
+        # Stable sort so ties keep their order of first appearance
+        keep[:] = False
+        keep[np.argsort(-frequency, kind="stable")[:top_k]] = True
+    if min_support is not None:
+        keep &= frequency >= min_support
+    if keep.all():
+        return options, option_index, None
+
+    kept = np.flatnonzero(keep)
+    new_ids = np.full(option_count, len(kept), dtype=np.intp)
+    new_ids[kept] = np.arange(len(kept))
+
+    other_text = np.full(len(uniques) + 1, None, dtype=object)
+    for unique_id, old_id in zip(unique_index, option_index):
+        if not keep[old_id]:
+            response = options[old_id]
+            other_text[unique_id] = response if other_text[unique_id] is None else f"{other_text[unique_id]}{delimiter} {response}"
+
+    return [options[i] for i in kept] + ["Other"], new_ids[option_index], other_text
+
+def encode_columns(profiles, delimiter, parallel=False, top_k=None, min_support=None):
+    """Return (options, rows x options uint8 indicator matrix, other text) for each column profile.
+
+    The columns were already factorized while profiling, so only their distinct
+    values are sent to the worker processes. Results are returned in order,
+    and each profile gets its option count and maximum tokens per cell. With
+    top_k or min_support set, rare options are collapsed into "Other" and the
+    other text holds their responses per row; otherwise it is None.
+    """
+    uniques = [list(profile["uniques"]) for profile in profiles]
+
+    workers = min(os.cpu_count() or 1, len(profiles))
+    if parallel and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            encoded = list(executor.map(encode_uniques, uniques, repeat(delimiter)))
+    else:
+        encoded = [encode_uniques(col_uniques, delimiter) for col_uniques in uniques]
+
+    results = []
+    for profile, (options, unique_index, option_index) in zip(profiles, encoded):
+        profile["options"] = len(options)
+        profile["max_tokens"] = int(np.bincount(unique_index).max()) if len(unique_index) else 0
+        codes = profile["codes"]
+
+        other_text = None
+        if top_k is not None or min_support is not None:
+            options, option_index, unique_other_text = cap_options(
+                options, codes, profile["uniques"], unique_index, option_index, delimiter, top_k, min_support
+            )
+            if unique_other_text is not None:
+                other_text = unique_other_text.take(codes)
+
+        indicators = build_indicators(codes, len(profile["uniques"]), len(options), unique_index, option_index)
+        results.append((options, indicators, other_text))
+    return results
+
+def indicator_values(indicators, indicator_format):
+    """Turn one column of the uint8 indicator matrix into output column values."""
+    if indicator_format == "1/0":
+        return np.ascontiguousarray(indicators)
+    if indicator_format == "1/0 (sparse)":
+        # Only the 1s are stored; Excel still receives plain 1/0 numbers
+        return pd.arrays.SparseArray(indicators, fill_value=0)
+    return np.where(indicators, "Yes", "No")
+
+def unique_column_name(name, used_names):
+    """Return name, or name with the first free numeric suffix, and mark it as used."""
+    if name in used_names:
+        suffix = 1
+        while f"{name}_{suffix}" in used_names:
+            suffix += 1
+        name = f"{name}_{suffix}"
+    used_names.add(name)
+    return name
+
+def assemble_columns(df, expanded_columns, keep_original_columns):
+    """Build the output frame with a single concat in the final column order.
+
+    The new columns of each expanded column go right after it, and the
+    expanded column itself is kept only if keep_original_columns is set.
+    Runs of untouched columns are taken as one slice.
+    """
+    blocks = []
+    untouched = []
+    for col in df.columns:
+        if col not in expanded_columns:
+            untouched.append(col)
+            continue
+        if keep_original_columns:
+            untouched.append(col)
+        if untouched:
+            blocks.append(df[untouched])
+            untouched = []
+        blocks.append(expanded_columns[col])
+    if untouched:
+        blocks.append(df[untouched])
+    if not blocks:
+        return df.copy()
+    return pd.concat(blocks, axis=1)
+
+def benchmark_split(delimiter, sizes=(1_000, 10_000, 100_000), repeat=3):
+    """Print the time to split one cell of each size with the old regex and the tokenizer."""
+    legacy_pattern = re.compile(re.escape(delimiter) + r"(?![^\(\[]*[\)\]])")
+    # Free text without brackets is the worst case for the lookahead regex
+    option = f"Option text{delimiter} other free text answer{delimiter} "
+    for size in sizes:
+        text = (option * (size // len(option) + 1))[:size]
+        timings = {}
+        for name, split in (
+            ("regex", lambda: [part.strip() for part in legacy_pattern.split(text)]),
+            ("tokenizer", lambda: split_cell.__wrapped__(text, delimiter)),
+        ):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                split()
+            timings[name] = (time.perf_counter() - start) / repeat
+        print(
+            f"{size:>7} chars: regex {timings['regex'] * 1000:.2f} ms, "
+            f"tokenizer {timings['tokenizer'] * 1000:.2f} ms"
+        )
+
+# Parsed sheets keyed by (path, sheet name, modification time)
+SHEET_CACHE = {}
+
+# Column profiles of the sheet currently in SHEET_CACHE, keyed by (column name, delimiter)
+PROFILE_CACHE = {}
+
+# Distinct values checked first, spread evenly over the column
+PROFILE_SAMPLE_SIZE = 200
+
+# Distinct values scanned per vectorized step after the sample
+PROFILE_CHUNK_SIZE = 5000
+
+def load_sheet(input_file, sheet_name):
+    """Return the parsed sheet, reading the workbook only once per file version.
+
+    The cached DataFrame is shared, so callers must not modify it in place.
+    """
+    key = (os.path.abspath(input_file), sheet_name, os.path.getmtime(input_file))
+    if key not in SHEET_CACHE:
+        # Only keep the most recent sheet in memory
+        SHEET_CACHE.clear()
+        PROFILE_CACHE.clear()
+        SHEET_CACHE[key] = read_sheet(input_file, sheet_name)
+    return SHEET_CACHE[key]
+
+def profile_column(column, delimiter):
+    """Return whether a column holds multiple responses, stopping at the first one found.
+
+    The distinct values are checked in vectorized chunks, starting with an
+    evenly spaced sample. Only values containing the delimiter are split. The
+    profile of a multiple-response column keeps its factorization for the
+    expansion step, which fills in the option count and maximum tokens per cell.
+    """
+    codes, uniques = pd.factorize(column)
+    text_index = np.flatnonzero([isinstance(value, str) for value in uniques])
+    text_values = pd.Series(uniques[text_index], dtype=object)
+
+    sample = np.unique(np.linspace(0, len(text_values) - 1, min(PROFILE_SAMPLE_SIZE, len(text_values)), dtype=np.intp))
+    order = np.concatenate([sample, np.setdiff1d(np.arange(len(text_values)), sample)])
+
+    for start in range(0, len(order), PROFILE_CHUNK_SIZE):
+        chunk = text_values.iloc[order[start:start + PROFILE_CHUNK_SIZE]]
+        for value in chunk[chunk.str.contains(delimiter, regex=False)]:
+            if len(split_outside_brackets(value, delimiter)) > 1:
+                return {"multiple": True, "codes": codes, "uniques": uniques, "options": None, "max_tokens": None}
+
+    return {"multiple": False, "options": len(uniques), "max_tokens": 1 if len(text_index) else 0}
+
+def profile_columns(df, columns, delimiter):
+    """Return the cached profile of each column, profiling the ones not seen yet."""
+    for col in columns:
+        if (col, delimiter) not in PROFILE_CACHE:
+            PROFILE_CACHE[col, delimiter] = profile_column(df[col], delimiter)
+    return {col: PROFILE_CACHE[col, delimiter] for col in columns}
+
+def expand_columns(df, columns, delimiter, indicator_format=INDICATOR_FORMATS[0], keep_original_columns=False, parallel=False, top_k=None, min_support=None):
+    """Replace every multiple-response column among columns by one indicator column per option.
+
+    Columns whose cells never hold more than one option are left as they are.
+    See encode_columns for parallel, top_k and min_support.
+    """
+    # Identify columns with multiple responses
+    profiles = profile_columns(df, columns, delimiter)
+    columns_with_multiple_responses = [col for col in columns if profiles[col]["multiple"]]
+
+    # Build the indicator columns of every multiple-response column
+    used_names = set(df.columns)
+    expanded_columns = {}
+    # Tokenize every distinct cell once and collect its options
+    encoded_columns = encode_columns(
+        [profiles[col] for col in columns_with_multiple_responses], delimiter, parallel, top_k, min_support
+    )
+    for col, (unique_responses, indicators, other_text) in zip(columns_with_multiple_responses, encoded_columns):
+        # Create new columns for each unique response
+        new_columns = {}
+        for option_id, response in enumerate(unique_responses):
+            new_col_name = unique_column_name(response.strip(), used_names)
+            new_columns[new_col_name] = indicator_values(indicators[:, option_id], indicator_format)
+
+        # Keep the collapsed responses as text next to the "Other" indicator
+        if other_text is not None:
+            new_columns[unique_column_name("Other text", used_names)] = other_text
+        expanded_columns[col] = pd.DataFrame(new_columns, index=df.index)
+
+    # Assemble the output in one go; skipped and untouched columns come
+    # straight from the original sheet at their original positions
+    return assemble_columns(df, expanded_columns, keep_original_columns)
@@ -1,9 +1,46 @@
+import argparse
 import csv
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
 from openpyxl import Workbook
-from tkinter import Frame, Tk, Button, Label
+from tkinter import BooleanVar, Checkbutton, Frame, StringVar, Tk, Button, Label, ttk
 from tkinter.filedialog import askopenfilename, asksaveasfilename
 from tkinter.messagebox import showerror, showinfo
 
+# Excel cannot hold more rows than this on a single sheet, header included
+EXCEL_MAX_ROWS = 1048576
+
+# Number of data rows used to pick a candidate type for each column
+TYPE_SAMPLE_ROWS = 1000
+
+# Plain decimal numbers only, so codes like "007" or "+92300..." stay text
+NUMBER_PATTERN = re.compile(r"-?(0|[1-9]\d*)(\.\d+)?")
+
+# Sidecar next to the output workbook recording how far the last conversion got
+STATE_SUFFIX = ".state.json"
+
+# Bytes kept back while copying a worksheet, enough to hold everything after </sheetData>
+SPLICE_TAIL_BYTES = 1 << 16
+
+DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%Y/%m/%d",
+    "%m/%d/%Y",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y/%m/%d %H:%M:%S",
+    "%m/%d/%Y %H:%M:%S",
+)
+
 # Function to open a file dialog for selecting the input CSV file
 def select_input_file():
     """Open file dialog to select input CSV file."""
@@ -23,26 +60,433 @@ def select_output_file(default_name="output.xlsx"):
     )
     return file_path if file_path else default_name  # Return the default if no file selected
 
-def convert_csv_to_excel(input_file, output_file):
-    """Convert CSV file to Excel file using openpyxl, replacing 'None' with 'none'."""
+def parse_text(value):
+    return value.replace("None", "none")
+
+def parse_boolean(value):
+    lowered = value.lower()
+    if lowered == "true":
+        return True
+    if lowered == "false":
+        return False
+    raise ValueError(f"Not a boolean: {value}")
+
+def parse_number(value):
+    if not NUMBER_PATTERN.fullmatch(value):
+        raise ValueError(f"Not a number: {value}")
+    return float(value) if "." in value else int(value)
+
+def parse_date(value):
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format)
+        except ValueError:
+            pass
+    raise ValueError(f"Not a date: {value}")
+
+# Candidate cell types in the order they are tried; text accepts everything
+CELL_PARSERS = {
+    "boolean": parse_boolean,
+    "number": parse_number,
+    "date": parse_date,
+}
+
+def accepts(parser, values):
+    """Return True if the parser accepts every non-empty value."""
     try:
-        # Create a new Excel workbook and select the active worksheet
-        wb = Workbook()
+        for value in values:
+            if value != "":
+                parser(value)
+        return True
+    except ValueError:
+        return False
+
+def infer_column_types(input_file, sample_rows=TYPE_SAMPLE_ROWS):
+    """Infer one cell type per column: sample the first rows, then verify the rest.
+
+    Each column gets the first type whose parser accepts all its sampled values.
+    The remaining rows are only checked against that candidate, and a column
+    falls back to text on the first value that does not parse.
+    """
+    with open(input_file, 'r', newline='', encoding='utf-8') as csvfile:
+        csvreader = csv.reader(csvfile)
+        header = next(csvreader, [])
+        sample = [row for _, row in zip(range(sample_rows), csvreader)]
+
+        types = []
+        for col_index in range(len(header)):
+            values = [row[col_index] for row in sample if col_index < len(row)]
+            column_type = "text"
+            if any(values):
+                for name, parser in CELL_PARSERS.items():
+                    if accepts(parser, values):
+                        column_type = name
+                        break
+            types.append(column_type)
+
+        # Verify the candidates against the rest of the file
+        typed_columns = [i for i, column_type in enumerate(types) if column_type != "text"]
+        for row in csvreader:
+            if not typed_columns:
+                break
+            for col_index in list(typed_columns):
+                if col_index < len(row) and not accepts(CELL_PARSERS[types[col_index]], (row[col_index],)):
+                    types[col_index] = "text"
+                    typed_columns.remove(col_index)
+    return types
+
+def convert_row(row, parsers=None):
+    """Convert one CSV data row with the per-column parsers, or as text when there are none."""
+    if parsers is None:
+        return [parse_text(value) for value in row]
+    return [
+        parse_text(value) if col_index >= len(parsers)
+        else None if value == "" and parsers[col_index] is not parse_text
+        else parsers[col_index](value)
+        for col_index, value in enumerate(row)
+    ]
+
+def column_parsers(column_types):
+    if column_types is None:
+        return None
+    return [CELL_PARSERS.get(column_type, parse_text) for column_type in column_types]
+
+def read_csv_rows(input_file, column_types=None):
+    """Yield CSV rows one at a time, replacing 'None' with 'none'.
+
+    When column_types is given, data cells are converted to that column's type
+    and the 'None' rule only applies to text columns.
+    """
+    parsers = column_parsers(column_types)
+    with open(input_file, 'r', newline='', encoding='utf-8') as csvfile:
+        csvreader = csv.reader(csvfile)
+        header = next(csvreader, None)
+        if header is None:
+            return
+        yield convert_row(header)
+        for row in csvreader:
+            yield convert_row(row, parsers)
+
+def write_excel(input_file, output_file, streaming=False, max_rows=EXCEL_MAX_ROWS - 1, typed=False, column_types=None):
+    """Write the CSV rows to an Excel file and return the number of rows read.
+
+    In streaming mode the workbook is opened write-only and every row is appended
+    as soon as it is read, so memory stays flat regardless of the row count.
+    Once a sheet holds max_rows data rows a new sheet is started, and the header
+    row is repeated at the top of each one. In typed mode numeric, date and
+    boolean columns are written as real cells instead of text, using
+    column_types when already known.
+    """
+    if not typed:
+        column_types = None
+    elif column_types is None:
+        column_types = infer_column_types(input_file)
+    wb = Workbook(write_only=streaming)
+    ws = None
+    sheet_count = 0
+    sheet_rows = 0
+    row_count = 0
+
+    rows = read_csv_rows(input_file, column_types)
+    header = next(rows, None)
+    if header is not None:
+        row_count += 1
+
+    for row in rows:
+        if ws is None or sheet_rows >= max_rows:
+            # Start a new shard and repeat the header row on it
+            sheet_count += 1
+            ws = new_sheet(wb, sheet_count, streaming)
+            ws.append(header)
+            sheet_rows = 0
+        ws.append(row)
+        sheet_rows += 1
+        row_count += 1
+
+    if ws is None:
+        # Header-only or empty CSV still produces a single sheet
+        ws = new_sheet(wb, 1, streaming)
+        if header is not None:
+            ws.append(header)
+
+    # Save the workbook to the output file
+    wb.save(output_file)
+    return row_count
+
+def new_sheet(wb, index, streaming):
+    """Return the sheet for shard number index, reusing the default sheet for the first one."""
+    if index == 1 and not streaming:
         ws = wb.active
+        ws.title = f"Sheet{index}"
+        return ws
+    return wb.create_sheet(title=f"Sheet{index}")
+
+def hash_row(digest, row):
+    """Feed one raw CSV row into the running prefix fingerprint."""
+    digest.update("\x1f".join(row).encode("utf-8"))
+    digest.update(b"\x1e")
+
+def output_stamp(output_file):
+    """Return the size and modification time of the workbook, to notice edits made outside the converter."""
+    stat = os.stat(output_file)
+    return {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+def write_state(output_file, row_count, digest, options, column_types, sheet_rows):
+    state = {
+        "rows": row_count,
+        "sheet_rows": sheet_rows,
+        "fingerprint": digest.hexdigest(),
+        "options": options,
+        "column_types": column_types,
+        "output": output_stamp(output_file),
+    }
+    with open(output_file + STATE_SUFFIX, 'w', encoding='utf-8') as state_file:
+        json.dump(state, state_file)
+
+def read_state(output_file):
+    """Return the saved state for output_file, or None if there is nothing to append to."""
+    state_path = output_file + STATE_SUFFIX
+    if not (os.path.exists(output_file) and os.path.exists(state_path)):
+        return None
+    try:
+        with open(state_path, 'r', encoding='utf-8') as state_file:
+            state = json.load(state_file)
+    except (OSError, ValueError):
+        return None
+    # A workbook saved by Excel since no longer has the parts append_sheets expects
+    if state.get("output") != output_stamp(output_file):
+        return None
+    return state
+
+def insert_before(xml, closing_tag, element):
+    """Insert element just before the closing tag of a small package part."""
+    index = xml.rindex(closing_tag)
+    return xml[:index] + element + xml[index:]
+
+def cell_format_count(styles):
+    match = re.search(r'<cellXfs count="(\d+)"', styles)
+    return int(match.group(1)) if match else 0
+
+def last_sheet_rows(row_count, max_rows):
+    """Number of data rows write_excel leaves on its last sheet for row_count CSV rows, header included."""
+    data_rows = max(row_count - 1, 0)
+    return (data_rows - 1) % max_rows + 1 if data_rows else 0
+
+def renumber_rows(sheet_xml, offset):
+    """Return the <row> elements of a worksheet part, moved down by offset rows."""
+    rows_xml = sheet_xml[sheet_xml.index(b"<sheetData>") + len(b"<sheetData>"):sheet_xml.rindex(b"</sheetData>")]
+    rows_xml = re.sub(rb'<row r="(\d+)"', lambda match: b'<row r="%d"' % (int(match.group(1)) + offset), rows_xml)
+    return re.sub(rb'<c r="([A-Z]+)(\d+)"', lambda match: b'<c r="%s%d"' % (match.group(1), int(match.group(2)) + offset), rows_xml)
+
+def last_sheet_part(workbook, rels):
+    """Return the package path of the last sheet, looked up through its relationship."""
+    sheet_rels = re.findall(r'<sheet [^>]*r:id="([^"]+)"', workbook)
+    relationship = sheet_rels and re.search(rf'<Relationship [^>]*\bId="{re.escape(sheet_rels[-1])}"[^>]*>', rels)
+    if not relationship:
+        raise ValueError("The workbook does not list its sheets.")
+    target = re.search(r'Target="([^"]+)"', relationship.group()).group(1)
+    return target[1:] if target.startswith("/") else "xl/" + target
+
+def splice_rows(source, target, rows_xml, last_row):
+    """Copy a worksheet part, inserting rows_xml before </sheetData> and updating <dimension>.
 
-        # Read the CSV file
+    The part is streamed in blocks and never parsed; only the last block is
+    searched for the end of the sheet data.
+    """
+    tail = b""
+    first = True
+    for block in iter(lambda: source.read(1 << 20), b""):
+        if first:
+            # The dimension, when there is one, comes before any row
+            block = re.sub(rb'(<dimension ref="[A-Z]+\d+:[A-Z]+)\d+', lambda match: match.group(1) + b"%d" % last_row, block, count=1)
+            first = False
+        tail += block
+        if len(tail) > SPLICE_TAIL_BYTES:
+            target.write(tail[:-SPLICE_TAIL_BYTES])
+            tail = tail[-SPLICE_TAIL_BYTES:]
+    index = tail.rfind(b"</sheetData>")
+    if index < 0:
+        raise ValueError("The last worksheet has no sheet data to append to.")
+    target.write(tail[:index] + rows_xml + tail[index:])
+
+def append_rows(output_file, header, rows, max_rows, sheet_rows):
+    """Append the rows to the workbook without reading its existing rows.
+
+    The last sheet, holding sheet_rows data rows, is filled up to max_rows
+    first; rows past that go to new sheets that start with the header row.
+    The rows are saved to a separate streaming workbook, and its rows and
+    worksheet parts are then copied into the output package. Old worksheets are
+    copied as they are and only the small parts listing the sheets are
+    rewritten. Returns the number of data rows on the last sheet afterwards.
+    """
+    spliced = rows[:max_rows - sheet_rows]
+    rest = rows[len(spliced):]
+    output_dir = os.path.dirname(os.path.abspath(output_file))
+    with tempfile.TemporaryDirectory(dir=output_dir) as tmp_dir:
+        delta_file = os.path.join(tmp_dir, "delta.xlsx")
+        wb = Workbook(write_only=True)
+        if spliced:
+            ws = wb.create_sheet()
+            for row in spliced:
+                ws.append(row)
+        for start in range(0, len(rest), max_rows):
+            ws = wb.create_sheet()
+            ws.append(header)
+            for row in rest[start:start + max_rows]:
+                ws.append(row)
+        wb.save(delta_file)
+
+        merged_file = os.path.join(tmp_dir, "merged.xlsx")
+        with zipfile.ZipFile(output_file) as old, zipfile.ZipFile(delta_file) as delta, \
+                zipfile.ZipFile(merged_file, 'w', zipfile.ZIP_DEFLATED) as merged:
+            workbook = old.read("xl/workbook.xml").decode("utf-8")
+            rels = old.read("xl/_rels/workbook.xml.rels").decode("utf-8")
+            content_types = old.read("[Content_Types].xml").decode("utf-8")
+            styles = old.read("xl/styles.xml").decode("utf-8")
+            delta_styles = delta.read("xl/styles.xml").decode("utf-8")
+            # Both packages come from openpyxl with the same column types, so the
+            # only cell format either may lack is the date one; keep the fuller list
+            if cell_format_count(delta_styles) > cell_format_count(styles):
+                styles = delta_styles
+
+            sheet_count = len(re.findall(r"<sheet ", workbook))
+            sheet_id = max(map(int, re.findall(r'sheetId="(\d+)"', workbook)), default=0)
+            rel_id = max(map(int, re.findall(r'Id="rId(\d+)"', rels)), default=0)
+            part_index = max(
+                (int(match.group(1)) for match in map(re.compile(r"xl/worksheets/sheet(\d+)\.xml$").match, old.namelist()) if match),
+                default=0,
+            )
+            delta_sheets = sorted(
+                (name for name in delta.namelist() if re.match(r"xl/worksheets/sheet\d+\.xml$", name)),
+                key=lambda name: int(re.search(r"(\d+)\.xml$", name).group(1)),
+            )
+
+            last_part = last_sheet_part(workbook, rels)
+            spliced_xml = None
+            if spliced:
+                # Below the header and the rows already on the sheet
+                spliced_xml = renumber_rows(delta.read(delta_sheets.pop(0)), sheet_rows + 1)
+
+            new_parts = {}
+            for delta_sheet in delta_sheets:
+                sheet_count += 1
+                sheet_id += 1
+                rel_id += 1
+                part_index += 1
+                part_name = f"xl/worksheets/sheet{part_index}.xml"
+                new_parts[part_name] = delta_sheet
+                workbook = insert_before(
+                    workbook, "</sheets>",
+                    f'<sheet name="Sheet{sheet_count}" sheetId="{sheet_id}" state="visible" r:id="rId{rel_id}" />',
+                )
+                rels = insert_before(
+                    rels, "</Relationships>",
+                    '<Relationship Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+                    f'Target="/{part_name}" Id="rId{rel_id}" />',
+                )
+                content_types = insert_before(
+                    content_types, "</Types>",
+                    f'<Override PartName="/{part_name}" '
+                    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml" />',
+                )
+
+            rewritten = {
+                "xl/workbook.xml": workbook,
+                "xl/_rels/workbook.xml.rels": rels,
+                "[Content_Types].xml": content_types,
+                "xl/styles.xml": styles,
+            }
+            for info in old.infolist():
+                if info.filename in rewritten:
+                    merged.writestr(info, rewritten[info.filename])
+                    continue
+                with old.open(info) as source, merged.open(info, 'w', force_zip64=True) as target:
+                    if info.filename == last_part and spliced_xml is not None:
+                        splice_rows(source, target, spliced_xml, sheet_rows + len(spliced) + 1)
+                    else:
+                        shutil.copyfileobj(source, target)
+            for part_name, delta_sheet in new_parts.items():
+                with delta.open(delta_sheet) as source, merged.open(part_name, 'w', force_zip64=True) as target:
+                    shutil.copyfileobj(source, target)
+        os.replace(merged_file, output_file)
+    return last_sheet_rows(len(rest) + 1, max_rows) if rest else sheet_rows + len(spliced)
+
+def incremental_write_excel(input_file, output_file, max_rows=EXCEL_MAX_ROWS - 1, typed=False):
+    """Append only the rows added since the last conversion to the existing output.
+
+    The state sidecar stores the number of CSV rows already converted and a
+    fingerprint of those rows. If the CSV still starts with exactly that prefix
+    the new rows are appended to the last sheet, continuing on new sheets past
+    max_rows (see append_rows), so the rows already in the workbook are never
+    read back; otherwise, or when the options changed or the workbook was
+    edited, the workbook is rebuilt.
+    Returns the number of new data rows written and whether a rebuild happened.
+    """
+    options = {"max_rows": max_rows, "typed": typed}
+    state = read_state(output_file)
+
+    if state is not None and state.get("options") == options:
+        digest = hashlib.sha256()
+        new_rows = []
         with open(input_file, 'r', newline='', encoding='utf-8') as csvfile:
             csvreader = csv.reader(csvfile)
+            header = None
+            row_count = 0
+            for row in csvreader:
+                if row_count == 0:
+                    header = row
+                hash_row(digest, row)
+                row_count += 1
+                if row_count == state["rows"]:
+                    break
+            prefix_matches = row_count == state["rows"] and digest.hexdigest() == state["fingerprint"]
+            if prefix_matches:
+                for row in csvreader:
+                    hash_row(digest, row)
+                    new_rows.append(row)
 
-            for row_index, row in enumerate(csvreader):
-                # Replace 'None' with 'none' in each cell
-                row = [value.replace("None", "none") for value in row]
-                
-                for col_index, value in enumerate(row):
-                    ws.cell(row=row_index + 1, column=col_index + 1, value=value)
+        if prefix_matches:
+            try:
+                parsers = column_parsers(state["column_types"])
+                new_rows = [convert_row(row, parsers) for row in new_rows]
+            except ValueError:
+                # A new value does not fit its column type any more
+                prefix_matches = False
 
-        # Save the workbook to the output file
-        wb.save(output_file)
+        if prefix_matches:
+            try:
+                sheet_rows = state["sheet_rows"]
+                if new_rows:
+                    sheet_rows = append_rows(output_file, convert_row(header), new_rows, max_rows, sheet_rows)
+            except (KeyError, ValueError):
+                # Not a layout this converter wrote, so rebuild it instead
+                pass
+            else:
+                write_state(output_file, row_count + len(new_rows), digest, options, state["column_types"], sheet_rows)
+                return len(new_rows), False
+
+    # Full rebuild with the streaming writer, then record the converted prefix
+    column_types = infer_column_types(input_file) if typed else None
+    row_count = write_excel(input_file, output_file, True, max_rows, typed, column_types)
+    digest = hashlib.sha256()
+    with open(input_file, 'r', newline='', encoding='utf-8') as csvfile:
+        for row in csv.reader(csvfile):
+            hash_row(digest, row)
+    write_state(output_file, row_count, digest, options, column_types, last_sheet_rows(row_count, max_rows))
+    return max(row_count - 1, 0), True
+
+def convert_csv_to_excel(input_file, output_file, streaming=False, max_rows=EXCEL_MAX_ROWS - 1, typed=False, incremental=False):
+    """Convert CSV file to Excel file using openpyxl, replacing 'None' with 'none'."""
+    try:
+        if incremental:
+            new_rows, rebuilt = incremental_write_excel(input_file, output_file, max_rows, typed)
+            if rebuilt:
+                showinfo("Success", f"File converted and saved to {output_file}")
+            else:
+                showinfo("Success", f"{new_rows} new rows appended to {output_file}")
+            return
+
+        write_excel(input_file, output_file, streaming, max_rows, typed)
         showinfo("Success", f"File converted and saved to {output_file}")
 
     except PermissionError:
@@ -53,6 +497,100 @@ def convert_csv_to_excel(input_file, output_file):
     except Exception as e:
         showerror("Error", f"An error occurred: {e}")
 
+def find_csv_files(pattern):
+    """Return the CSV files in a directory, or the files matching a glob pattern."""
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "*.csv")
+    return sorted(path for path in glob.glob(pattern) if os.path.isfile(path))
+
+def timed_write_excel(input_file, output_file, streaming, max_rows, typed):
+    """Worker task for batch mode: convert one file and return its data row count and duration."""
+    start = time.perf_counter()
+    row_count = write_excel(input_file, output_file, streaming, max_rows, typed)
+    # The header row is not counted towards the throughput
+    return max(row_count - 1, 0), time.perf_counter() - start
+
+def batch_convert(pattern, output_dir=None, workers=None, streaming=True, max_rows=EXCEL_MAX_ROWS - 1, typed=False):
+    """Convert every matching CSV file in parallel without the GUI.
+
+    Each workbook is saved next to its CSV, or in output_dir when given. Progress
+    and errors are printed per file, followed by a throughput summary. Returns
+    the number of files that failed.
+    """
+    input_files = find_csv_files(pattern)
+    if not input_files:
+        print(f"No CSV files found for {pattern}")
+        return 0
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    # No more processes than files, and report the number actually started
+    workers = min(workers or os.cpu_count() or 1, len(input_files))
+    total_rows = 0
+    failed = 0
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for input_file in input_files:
+            output_file = os.path.splitext(input_file)[0] + ".xlsx"
+            if output_dir:
+                output_file = os.path.join(output_dir, os.path.basename(output_file))
+            future = executor.submit(timed_write_excel, input_file, output_file, streaming, max_rows, typed)
+            futures[future] = (input_file, output_file)
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            input_file, output_file = futures[future]
+            try:
+                row_count, elapsed = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"[{done}/{len(input_files)}] FAILED {input_file}: {e}")
+                continue
+            total_rows += row_count
+            print(f"[{done}/{len(input_files)}] {input_file} -> {output_file}: {row_count} rows in {elapsed:.2f}s")
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"Converted {len(input_files) - failed}/{len(input_files)} files, "
+        f"{total_rows} rows in {elapsed:.2f}s ({total_rows / elapsed:,.0f} rows/sec, {workers} workers)"
+    )
+    return failed
+
+def legacy_write_excel(input_file, output_file):
+    """Write the CSV cell by cell the way the converter originally did, as the benchmark baseline."""
+    wb = Workbook()
+    ws = wb.active
+    row_count = 0
+    with open(input_file, 'r', newline='', encoding='utf-8') as csvfile:
+        for row_index, row in enumerate(csv.reader(csvfile)):
+            row = [value.replace("None", "none") for value in row]
+            for col_index, value in enumerate(row):
+                ws.cell(row=row_index + 1, column=col_index + 1, value=value)
+            row_count += 1
+    wb.save(output_file)
+    return row_count
+
+def benchmark_conversion(input_file, repeat=3):
+    """Print rows/sec of the original per-cell writer and the in-memory and streaming paths."""
+    modes = (
+        ("per-cell", legacy_write_excel),
+        ("in-memory", lambda source, target: write_excel(source, target, False)),
+        ("streaming", lambda source, target: write_excel(source, target, True)),
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_file = os.path.join(tmp_dir, "benchmark.xlsx")
+        for mode, convert in modes:
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                row_count = convert(input_file, output_file)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            # Data rows only, as in batch mode
+            row_count = max(row_count - 1, 0)
+            print(f"{mode:>10}: {row_count} rows in {best:.2f}s ({row_count / best:,.0f} rows/sec)")
+
 # GUI Application
 def main():
     """Main function to run the GUI application."""
@@ -61,6 +599,10 @@ def main():
 
     input_file = None
     output_file = None
+    streaming_var = BooleanVar()
+    typed_var = BooleanVar()
+    incremental_var = BooleanVar()
+    max_rows = StringVar(value=str(EXCEL_MAX_ROWS - 1))
 
     def load_input_file():
         nonlocal input_file
@@ -81,7 +623,17 @@ def main():
         if not output_file:
             showinfo("Error", "No output file selected.")
             return
-        convert_csv_to_excel(input_file, output_file)
+        try:
+            rows_per_sheet = int(max_rows.get())
+        except ValueError:
+            showerror("Error", "Rows per sheet must be an integer.")
+            return
+        if not 0 < rows_per_sheet < EXCEL_MAX_ROWS:
+            showerror("Error", f"Rows per sheet must be between 1 and {EXCEL_MAX_ROWS - 1}.")
+            return
+        convert_csv_to_excel(
+            input_file, output_file, streaming_var.get(), rows_per_sheet, typed_var.get(), incremental_var.get()
+        )
 
     # Create a frame to contain all widgets and add padding to the frame
     main_frame = Frame(root, padx=20, pady=20)
@@ -110,6 +662,28 @@ def main():
     output_label = Label(main_frame, text="Output File: None")
     output_label.pack(pady=5)
 
+    # Checkbox for the low-memory streaming conversion
+    streaming_checkbox = Checkbutton(
+        main_frame, text="Streaming Mode (large files)", variable=streaming_var
+    )
+    streaming_checkbox.pack(pady=10)
+
+    # Checkbox for writing numbers, dates and booleans as typed cells
+    typed_checkbox = Checkbutton(
+        main_frame, text="Typed Cells (numbers, dates, booleans)", variable=typed_var
+    )
+    typed_checkbox.pack(pady=10)
+
+    # Checkbox for appending only the rows added since the last conversion
+    incremental_checkbox = Checkbutton(
+        main_frame, text="Incremental Update (append new rows)", variable=incremental_var
+    )
+    incremental_checkbox.pack(pady=10)
+
+    Label(main_frame, text="Rows per Sheet:").pack(pady=5)
+    max_rows_entry = ttk.Entry(main_frame, textvariable=max_rows)
+    max_rows_entry.pack(pady=5)
+
     Button(
         main_frame,
         text="Convert File",
@@ -122,4 +696,25 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
-    main()
+    # Needed for the process pool when running as a frozen executable
+    multiprocessing.freeze_support()
+
+    parser = argparse.ArgumentParser(description="CSV to Excel Converter")
+    parser.add_argument("--benchmark", metavar="CSV", help="Compare rows/sec of the original, in-memory and streaming conversion on a CSV file")
+    parser.add_argument("--batch", metavar="PATH", help="Convert every CSV in a directory or matching a glob pattern, without the GUI")
+    parser.add_argument("--output-dir", help="Directory for batch output files (default: next to each CSV)")
+    parser.add_argument("--workers", type=int, help="Number of worker processes for batch mode (default: number of cores)")
+    parser.add_argument("--rows-per-sheet", type=int, default=EXCEL_MAX_ROWS - 1, help="Data rows per sheet before starting a new one")
+    parser.add_argument("--typed", action="store_true", help="Write numbers, dates and booleans as typed cells")
+    args = parser.parse_args()
+    if not 0 < args.rows_per_sheet < EXCEL_MAX_ROWS:
+        parser.error(f"--rows-per-sheet must be between 1 and {EXCEL_MAX_ROWS - 1}")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.benchmark:
+        benchmark_conversion(args.benchmark)
+    elif args.batch:
+        failed = batch_convert(args.batch, args.output_dir, args.workers, True, args.rows_per_sheet, args.typed)
+        raise SystemExit(1 if failed else 0)
+    else:
+        main()
@@ -1,8 +1,15 @@
 import re
+import numpy as np
 import pandas as pd
+from openpyxl import Workbook, load_workbook
+from pandas.api.types import is_object_dtype, is_string_dtype
 from tkinter import BooleanVar, Frame, StringVar, Tk, Button, Label, ttk
 from tkinter.filedialog import askopenfilename, asksaveasfilename
-from tkinter.messagebox import showerror, showinfo
+from tkinter.messagebox import showerror, showinfo, showwarning
+from common import (
+    ALL_SHEETS, EXCEL_MAX_ROWS, load_clean_sheet, load_codebook, load_mapping, normalize_response,
+    response_key, strip_column, write_sheets,
+)
 
 # Function to open a file dialog for selecting the input file
 def select_input_file():
@@ -30,12 +37,161 @@ def select_mapping_file():
     )
     return file_path
 
-def load_mapping(file_path):
-    """Load mapping from the Excel file into a dictionary."""
-    mapping_df = pd.read_excel(file_path, header=None)
-    if mapping_df.shape[1] != 2:
-        raise ValueError("Mapping file must have exactly two columns.")
-    return dict(zip(mapping_df[0], mapping_df[1]))
+def apply_codebook(column, entry, steps=()):
+    """Replace the responses of one column with its codebook numbers through category codes.
+
+    With normalization steps, cells and responses are matched on their
+    normalized keys, each distinct value being normalized once. Cells that are
+    not in the codebook keep their original value.
+    """
+    values = column.to_numpy(dtype=object)
+    if steps:
+        entry = entry.groupby([response_key(response, steps) for response in entry.index], sort=False).first()
+        codes, uniques = pd.factorize(column)
+        keys = np.array([response_key(value, steps) for value in uniques] + [None], dtype=object)
+        column = pd.Series(keys.take(codes), index=column.index)
+    codes = pd.Categorical(column, categories=entry.index).codes
+    return pd.Series(np.where(codes >= 0, entry.to_numpy().take(codes), values), index=column.index)
+
+def map_column(column, mapping):
+    """Replace the strings of one column using the mapping dictionary.
+
+    Each distinct value is looked up once and the results are broadcast back
+    to the rows with NumPy take. Values not in the mapping are kept as they are.
+    """
+    if not (is_object_dtype(column) or is_string_dtype(column)):
+        return column
+    codes, uniques = pd.factorize(column)
+    if len(uniques) == 0:
+        return column  # Every cell is blank
+    mapped = np.empty(len(uniques), dtype=object)
+    mapped[:] = [mapping.get(value, value) if isinstance(value, str) else value for value in uniques]
+    values = column.to_numpy(dtype=object)
+    return pd.Series(np.where(codes >= 0, mapped.take(codes, mode="clip"), values), index=column.index)
+
+def standardize_frame(responses_df, mapping, codebook, steps, cols_to_skip, delete_first_column):
+    """Map the responses of every column not skipped and return the standardized frame.
+
+    The frame is modified in place; cols_to_skip holds zero-based positions.
+    """
+    cols_to_process = [
+        i for i in range(responses_df.shape[1]) if i not in cols_to_skip
+    ]
+
+    # Columns with their own codebook entry are converted through category codes
+    coded_cols = [i for i in cols_to_process if str(responses_df.columns[i]) in codebook]
+    for i in coded_cols:
+        entry = codebook[str(responses_df.columns[i])]
+        responses_df.isetitem(i, apply_codebook(responses_df.iloc[:, i], entry, steps))
+    cols_to_process = [i for i in cols_to_process if i not in coded_cols]
+
+    # Map the remaining columns through the flat mapping, one column at a time
+    for i in cols_to_process:
+        responses_df.isetitem(i, map_column(responses_df.iloc[:, i], mapping))
+
+    # Remove the first column
+    if delete_first_column:
+        responses_df = responses_df.iloc[:, 1:]
+    return responses_df
+
+# Rows mapped at a time in streaming mode
+STREAM_CHUNK_ROWS = 10000
+
+def header_names(row):
+    """Name the header cells the way pd.read_excel does for blanks and duplicates."""
+    names = []
+    for i, value in enumerate(row):
+        name = f"Unnamed: {i}" if value is None else value
+        base, count = name, 0
+        while name in names:
+            count += 1
+            name = f"{base}.{count}"
+        names.append(name)
+    return names
+
+def iter_sheet_rows(input_file, sheet_name):
+    """Yield the header and then every data row of the sheet from a read-only workbook.
+
+    With ALL_SHEETS the sheets are read in order and the repeated header of
+    every sheet after the first is skipped. Blank rows at the end of a sheet
+    are dropped, as pd.read_excel does.
+    """
+    wb = load_workbook(input_file, read_only=True, data_only=True)
+    try:
+        sheets = wb.worksheets if sheet_name == ALL_SHEETS else [wb[sheet_name]]
+        width = None
+        for ws in sheets:
+            rows = ws.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                continue
+            if width is None:
+                while header and header[-1] is None:
+                    header = header[:-1]
+                width = len(header)
+                yield header_names(header)
+            blank_rows = 0
+            for row in rows:
+                row = tuple(row[:width]) + (None,) * (width - len(row))
+                if all(value is None for value in row):
+                    blank_rows += 1
+                    continue
+                for _ in range(blank_rows):
+                    yield (None,) * width
+                blank_rows = 0
+                yield row
+    finally:
+        wb.close()
+
+def iter_chunks(rows, chunk_size):
+    """Group an iterator of rows into lists of at most chunk_size rows."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def stream_file(input_file, output_file, mapping, codebook, steps, cols_to_skip, delete_first_column, sheet_name, chunk_size=STREAM_CHUNK_ROWS):
+    """Map the sheet chunk by chunk into a write-only workbook and return the number of rows.
+
+    Only one chunk of rows is held in memory at a time. Output that does not
+    fit in one Excel sheet continues on Sheet2, Sheet3, ... with the header
+    repeated.
+    """
+    rows = iter_sheet_rows(input_file, sheet_name)
+    header = next(rows, None)
+    if header is None:
+        raise ValueError("The selected sheet is empty.")
+    out_header = header[1:] if delete_first_column else header
+
+    wb = Workbook(write_only=True)
+    ws = None
+    sheet_count = 0
+    sheet_rows = EXCEL_MAX_ROWS
+    total_rows = 0
+    for chunk in iter_chunks(rows, chunk_size):
+        chunk_df = pd.DataFrame(chunk, columns=header)
+        for i in range(chunk_df.shape[1]):
+            chunk_df.isetitem(i, strip_column(chunk_df.iloc[:, i]))
+        chunk_df = standardize_frame(chunk_df, mapping, codebook, steps, cols_to_skip, delete_first_column)
+        chunk_df = chunk_df.astype(object)
+        for row in chunk_df.where(chunk_df.notna(), None).itertuples(index=False, name=None):
+            if sheet_rows == EXCEL_MAX_ROWS:
+                sheet_count += 1
+                ws = wb.create_sheet(f"Sheet{sheet_count}")
+                ws.append(out_header)
+                sheet_rows = 1
+            ws.append(row)
+            sheet_rows += 1
+        total_rows += len(chunk)
+    if ws is None:
+        ws = wb.create_sheet("Sheet1")
+        ws.append(out_header)
+    wb.save(output_file)
+    return total_rows
 
 def process_file(
     input_file,
@@ -43,50 +199,47 @@ def process_file(
     mapping_file,
     cols_to_skip,
     delete_first_column,
-    sheet_name
+    sheet_name,
+    streaming=False,
+    chunk_size=STREAM_CHUNK_ROWS
 ):
+    # Normalized strings are only cached for one run
+    normalize_response.cache_clear()
     try:
         # Load the mapping data from the Excel file
         mapping = load_mapping(mapping_file)
-        
-        # Load the Excel file with the specified sheet
-        responses_df = pd.read_excel(input_file, sheet_name=sheet_name)
-
-        # Strip whitespace from all cells in the DataFrame
-        responses_df = responses_df.map(lambda x: x.strip() if isinstance(x, str) else x)
-
-        def replace_responses(cell):
-            """Replace text in a cell based on the mapping dictionary."""
-            if isinstance(cell, str):
-                # Directly match the entire cell value against the keys in the mapping dictionary
-                cell = mapping.get(cell, cell)  # Replace cell value with the mapped value if it exists, otherwise keep the original cell value
-            return cell
-
-        # Copy the DataFrame and apply the replacement function to the desired rows and columns
-        standardized_df = responses_df.copy()
+        saved = load_codebook(
+            mapping_file,
+            lambda: showwarning(
+                "Warning",
+                "The mapping file was edited after its codebook was saved. Only the mapping file is used.",
+            ),
+        )
+        codebook, steps = saved.columns, saved.steps
 
         # Ensure cols_to_skip is a list of integers
         cols_to_skip = [
             int(col.strip()) - 1 for col in cols_to_skip if col.strip().isdigit()
         ]
 
-        # Identify the columns to skip
-        cols_to_process = [
-            i for i in range(standardized_df.shape[1]) if i not in cols_to_skip
-        ]
-
-        # Apply the replacement function, skipping the specified columns
-        standardized_df.iloc[:, cols_to_process] = standardized_df.iloc[
-            :, cols_to_process
-        ].map(replace_responses)
-
-        # Remove the first column
-        if delete_first_column:
-            standardized_df = standardized_df.iloc[:, 1:]
-
         # Try to save the standardized DataFrame to a new Excel file
         try:
-            standardized_df.to_excel(output_file, index=False)
+            if streaming:
+                # Read, map and write a fixed number of rows at a time
+                stream_file(
+                    input_file, output_file, mapping, codebook, steps,
+                    cols_to_skip, delete_first_column, sheet_name, int(chunk_size)
+                )
+            else:
+                # Load the Excel file with the specified sheet
+                # Whitespace is stripped from string-type columns only
+                responses_df = load_clean_sheet(input_file, sheet_name)
+
+                # Copy the DataFrame and apply the replacement function to the desired rows and columns
+                standardized_df = standardize_frame(
+                    responses_df.copy(), mapping, codebook, steps, cols_to_skip, delete_first_column
+                )
+                write_sheets(standardized_df, output_file)
             showinfo("Success", f"Updated DataFrame saved to {output_file}")
         except PermissionError:
             showerror(
@@ -108,6 +261,7 @@ def main():
     sheet_name = StringVar()
     cols_to_skip = StringVar()
     delete_first_column = BooleanVar()
+    streaming = BooleanVar()
 
     def load_input_file():
         nonlocal input_file
@@ -116,7 +270,7 @@ def main():
             input_label.config(text=f"Input File: {input_file}")
             # Populate sheet dropdown
             sheet_names = pd.ExcelFile(input_file).sheet_names
-            sheet_dropdown["values"] = sheet_names
+            sheet_dropdown["values"] = sheet_names + ([ALL_SHEETS] if len(sheet_names) > 1 else [])
             if sheet_names:
                 sheet_dropdown.set(sheet_names[0])  # Set default to the first sheet
 
@@ -150,7 +304,8 @@ def main():
             col.strip() for col in cols_to_skip.get().split(",") if col.strip()
         ]
         process_file(
-            input_file, output_file, mapping_file, cols_to_skip_list, delete_first_column.get(), sheet_name.get()
+            input_file, output_file, mapping_file, cols_to_skip_list, delete_first_column.get(), sheet_name.get(),
+            streaming.get()
         )
 
     # Create a frame to contain all widgets and add padding to the frame
@@ -204,6 +359,11 @@ def main():
     )
     delete_first_column_check.pack(pady=5)
 
+    streaming_check = ttk.Checkbutton(
+        main_frame, text="Stream Large Files (low memory)", variable=streaming
+    )
+    streaming_check.pack(pady=5)
+
     Button(
         main_frame,
         text="Process File",
@@ -1,8 +1,15 @@
-import ast
+import struct
+from dataclasses import dataclass
+from datetime import datetime
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype
 from tkinter import BooleanVar, Frame, StringVar, Tk, Button, Label, ttk
 from tkinter.filedialog import askopenfilename, asksaveasfilename
-from tkinter.messagebox import showerror, showinfo
+from tkinter.messagebox import showerror, showinfo, showwarning
+from common import (
+    ALL_SHEETS, load_clean_sheet, load_codebook, load_mapping, normalize_response, response_key,
+)
 
 # Function to open a file dialog for selecting the input file
 def select_input_file():
@@ -30,12 +37,302 @@ def select_mapping_file():
     )
     return file_path
 
-def load_mapping(file_path):
-    """Load mapping from the Excel file into a dictionary."""
-    mapping_df = pd.read_excel(file_path, header=None)
-    if mapping_df.shape[1] != 2:
-        raise ValueError("Mapping file must have exactly two columns.")
-    return dict(zip(mapping_df[0], mapping_df[1]))
+@dataclass(slots=True)
+class Variable:
+    """Variable View metadata of one output column.
+
+    value_labels maps each response to its code, or is None when the
+    variable gets no VALUE LABELS.
+    """
+    name: str
+    label: str
+    type: str = "Numeric"
+    width: int = 8
+    value_labels: dict | None = None
+    measure: str = "Nominal"
+    align: str = "Left"
+
+    def code_labels(self):
+        """Return the label of each code in code order; a code given twice keeps its last response."""
+        labels = {}
+        for response, number in self.value_labels.items():
+            labels[number] = str(response)
+        return dict(sorted(labels.items()))
+
+# Variables per VARIABLE LABELS command
+SYNTAX_BATCH = 500
+
+def variable_runs(positions, variables):
+    """Yield consecutive positions as "Q1 TO Q9" ranges and lone ones as names."""
+    start = previous = None
+    for position in positions:
+        if previous is not None and position == previous + 1:
+            previous = position
+            continue
+        if start is not None:
+            yield variables[start].name if start == previous else f"{variables[start].name} TO {variables[previous].name}"
+        start = previous = position
+    if start is not None:
+        yield variables[start].name if start == previous else f"{variables[start].name} TO {variables[previous].name}"
+
+def grouped_positions(variables, key, positions=None):
+    """Group variable positions (all by default) by key(variable), in order of first appearance."""
+    groups = {}
+    for position in range(len(variables)) if positions is None else positions:
+        groups.setdefault(key(variables[position]), []).append(position)
+    return groups
+
+def write_syntax(file, variables, changed_only=False, new_positions=()):
+    """Write the SPSS syntax for the variables to an open file, one command at a time.
+
+    Consecutive variables sharing a format, measure or alignment are listed
+    with TO, labels are batched SYNTAX_BATCH variables per command, and
+    variables with an identical set of value labels share one command.
+
+    In changed-only mode the active dataset is kept: only the variables at
+    new_positions are defined, with NUMERIC and STRING instead of DATA LIST,
+    and value labels are added with ADD VALUE LABELS.
+    """
+    positions = list(new_positions) if changed_only else list(range(len(variables)))
+
+    # Runs of consecutive variables sharing a format
+    letters = {"String": "A", "Date": "DATETIME"}
+    formats = [f"{letters.get(variable.type, 'F')}{variable.width}" for variable in variables]
+    runs = []
+    for position in positions:
+        if runs and runs[-1][-1] == position - 1 and formats[position] == formats[runs[-1][0]]:
+            runs[-1].append(position)
+        else:
+            runs.append([position])
+    if not changed_only:
+        entries = [f"{next(variable_runs(run, variables))} ({formats[run[0]]})" for run in runs]
+        file.write("DATA LIST FREE /\n    " + "\n    ".join(entries) + ".\n")
+    else:
+        for run in runs:
+            command = "STRING" if variables[run[0]].type == "String" else "NUMERIC"
+            file.write(f"{command} {next(variable_runs(run, variables))} ({formats[run[0]]}).\n")
+
+    # VARIABLE LABELS, with newlines replaced and double quotes doubled
+    for batch in range(0, len(positions), SYNTAX_BATCH):
+        entries = [
+            '{} "{}"'.format(
+                variables[position].name,
+                variables[position].label.replace('\n', ' ').replace('\r', '').replace('"', '""'),
+            )
+            for position in positions[batch:batch + SYNTAX_BATCH]
+        ]
+        file.write("VARIABLE LABELS " + "\n    /".join(entries) + ".\n")
+
+    # VARIABLE LEVEL and VARIABLE ALIGNMENT, one list per setting
+    for command, key in (("VARIABLE LEVEL", lambda variable: variable.measure), ("VARIABLE ALIGNMENT", lambda variable: variable.align)):
+        groups = grouped_positions(variables, key, positions)
+        if groups:
+            file.write(command + " " + "\n    /".join(
+                " ".join(variable_runs(group, variables)) + f" ({setting.upper()})"
+                for setting, group in groups.items()
+            ) + ".\n")
+
+    # One VALUE LABELS command per distinct set of labels, listed by code
+    labels_command = "ADD VALUE LABELS" if changed_only else "VALUE LABELS"
+    groups = grouped_positions(
+        variables,
+        lambda variable: tuple(variable.code_labels().items()) if variable.value_labels else None,
+    )
+    for value_labels, group in groups.items():
+        if value_labels is None:
+            continue
+        file.write(f"{labels_command} " + " ".join(variable_runs(group, variables)) + "\n")
+        # Quotes inside a label are doubled
+        file.write("\n".join("    {} '{}'".format(value, label.replace("'", "''")) for value, label in value_labels) + ".\n")
+
+# SPSS system file (.sav) layout constants
+SAV_BIAS = 100.0
+SAV_SYSMIS = -np.finfo(np.float64).max
+SAV_CHUNK_ROWS = 10000
+SAV_MAX_STRING = 255
+SAV_MAX_VALUE_LABEL = 120
+SAV_MEASURES = {"Nominal": 1, "Ordinal": 2, "Scale": 3}
+SAV_ALIGNMENTS = {"Left": 0, "Right": 1, "Center": 2}
+# Seconds from the start of the SPSS calendar (14 Oct 1582) to 1 Jan 1970
+SAV_EPOCH_OFFSET = 12219379200.0
+
+def sav_text(value, size, limit):
+    """Encode text as UTF-8, cut to limit bytes on a character boundary and pad to size."""
+    data = str(value).encode("utf-8")[:limit].decode("utf-8", "ignore").encode("utf-8")
+    return data.ljust(size, b" ")
+
+def sav_format(type_, width, decimals=0):
+    """Pack a print/write format (type, width, decimals) into one integer."""
+    return (type_ << 16) | (width << 8) | decimals
+
+def sav_string_width(values):
+    """Return the byte width of a string variable, between 1 and SAV_MAX_STRING."""
+    lengths = [len(value.encode("utf-8")) for value in set(values)]
+    return min(max(lengths, default=1), SAV_MAX_STRING) or 1
+
+def sav_datetimes(values):
+    """Return dates as SPSS DATETIME values, seconds since 14 Oct 1582, with NaN for missing ones."""
+    if values.dt.tz is not None:
+        values = values.dt.tz_localize(None)
+    return (values - pd.Timestamp("1970-01-01")).dt.total_seconds().to_numpy(dtype=np.float64) + SAV_EPOCH_OFFSET
+
+def sav_number(value):
+    """Return a cell as a number for a numeric variable, or NaN when it is not one."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+def sav_dictionary(variables, widths, compress, case_count):
+    """Return the header and dictionary records of a .sav file as bytes.
+
+    widths holds 0 for numeric variables and the byte width of string ones.
+    Variables with an identical set of value labels share one label record.
+    """
+    now = datetime.now()
+    slots = [1 if width == 0 else -(-width // 8) for width in widths]
+    records = [
+        b"$FL2",
+        sav_text("@(#) SPSS DATA FILE - formToSPSS", 60, 60),
+        struct.pack("<4i", 2, sum(slots), 1 if compress else 0, 0),
+        struct.pack("<id", case_count, SAV_BIAS),
+        now.strftime("%d %b %y").encode("ascii"),
+        now.strftime("%H:%M:%S").encode("ascii"),
+        b" " * 64,
+        b"\0" * 3,
+    ]
+
+    # One variable record per variable, with continuation records for long strings
+    indexes = []
+    position = 1
+    for variable, width, count in zip(variables, widths, slots):
+        indexes.append(position)
+        position += count
+        if width:
+            format_ = sav_format(1, width)
+        elif variable.type == "Date":
+            format_ = sav_format(22, 20)
+        else:
+            format_ = sav_format(5, 8)
+        records.append(struct.pack("<5i", 2, width, 1, 0, format_) + struct.pack("<i", format_))
+        records.append(sav_text(variable.name.upper(), 8, 8))
+        label = sav_text(variable.label, 0, 255)
+        records.append(struct.pack("<i", len(label)) + label.ljust(-(-len(label) // 4) * 4, b" "))
+        for _ in range(count - 1):
+            records.append(struct.pack("<6i", 2, -1, 0, 0, 0, 0) + b" " * 8)
+
+    # Value labels, grouped by identical label sets
+    groups = {}
+    for index, variable in zip(indexes, variables):
+        if variable.value_labels:
+            groups.setdefault(tuple(variable.code_labels().items()), []).append(index)
+    for items, indexes_ in groups.items():
+        records.append(struct.pack("<ii", 3, len(items)))
+        for value, label in items:
+            label = sav_text(label, 0, SAV_MAX_VALUE_LABEL)
+            entry = struct.pack("<dB", float(value), len(label)) + label
+            records.append(entry.ljust(8 + -(-(len(label) + 1) // 8) * 8, b" "))
+        records.append(struct.pack(f"<ii{len(indexes_)}i", 4, len(indexes_), *indexes_))
+
+    # Machine integer and floating point info, display parameters and encoding
+    records.append(struct.pack("<4i8i", 7, 3, 4, 8, 1, 0, 0, -1, 1, 1, 2, 65001))
+    records.append(struct.pack("<4i3d", 7, 4, 8, 3, SAV_SYSMIS, np.finfo(np.float64).max, np.nextafter(SAV_SYSMIS, 0)))
+    display = [
+        value for variable in variables
+        for value in (SAV_MEASURES[variable.measure], 8, SAV_ALIGNMENTS[variable.align])
+    ]
+    records.append(struct.pack(f"<4i{len(display)}i", 7, 11, 4, len(display), *display))
+    records.append(struct.pack("<4i", 7, 20, 1, 5) + b"UTF-8")
+    records.append(struct.pack("<ii", 999, 0))
+    return b"".join(records)
+
+def sav_slots(columns, widths, start, stop):
+    """Return the rows start:stop as an array of 8-byte slots, shaped (rows, slots, 8)."""
+    blocks = []
+    for column, width in zip(columns, widths):
+        if width == 0:
+            blocks.append(column[start:stop].astype("<f8").view(np.uint8).reshape(-1, 1, 8))
+        else:
+            size = -(-width // 8) * 8
+            values = np.array([sav_text(value, size, width) for value in column[start:stop]], dtype=f"S{size}")
+            blocks.append(values.view(np.uint8).reshape(-1, size // 8, 8))
+    return np.concatenate(blocks, axis=1)
+
+def sav_compress(slots, numeric):
+    """Return the bytecode commands and the flags of slots stored raw after them.
+
+    Whole numbers between -99 and 151 fit in the command byte itself, missing
+    values and blank string segments have their own codes, and every other
+    slot is written raw.
+    """
+    values = slots.view("<f8")[..., 0]
+    blank = (slots == ord(" ")).all(axis=2)
+    whole = (values == np.floor(values)) & (values >= 1 - SAV_BIAS) & (values <= 251 - SAV_BIAS)
+    commands = np.full(values.shape, 253, dtype=np.uint8)
+    commands[numeric & whole] = (values[numeric & whole] + SAV_BIAS).astype(np.uint8)
+    commands[numeric & np.isnan(values)] = 255
+    commands[~numeric & blank] = 254
+    return commands.ravel(), commands.ravel() == 253
+
+def sav_blocks(commands, raw, data):
+    """Lay out complete groups of eight commands, each followed by its raw slots."""
+    groups = len(commands) // 8
+    raw_counts = raw.reshape(groups, 8).sum(axis=1)
+    starts = np.concatenate(([0], np.cumsum(8 + 8 * raw_counts)[:-1]))
+    out = np.empty(8 * groups + 8 * int(raw_counts.sum()), dtype=np.uint8)
+    out[starts[:, None] + np.arange(8)] = commands.reshape(groups, 8)
+    slots = np.flatnonzero(raw)
+    rank = np.arange(len(slots)) - np.concatenate(([0], np.cumsum(raw_counts)[:-1]))[slots // 8]
+    out[(starts[slots // 8] + 8 + 8 * rank)[:, None] + np.arange(8)] = data[slots]
+    return out.tobytes()
+
+def write_sav(output_file, variables, columns, compress=False, chunk_rows=SAV_CHUNK_ROWS):
+    """Write the variables and their data to an SPSS system file.
+
+    columns holds one array per variable: floats (NaN for missing) for
+    numeric and date variables and text for string ones. Cases are encoded and
+    written SAV_CHUNK_ROWS rows at a time, with optional bytecode compression.
+    """
+    widths = [
+        sav_string_width(column) if variable.type == "String" else 0
+        for variable, column in zip(variables, columns)
+    ]
+    case_count = len(columns[0]) if columns else 0
+    # Which 8-byte slots of a case hold numbers rather than string segments
+    numeric = np.array(
+        [width == 0 for width in widths for _ in range(1 if width == 0 else -(-width // 8))], dtype=bool
+    )
+    with open(output_file, "wb") as file:
+        file.write(sav_dictionary(variables, widths, compress, case_count))
+        pending_commands = np.empty(0, dtype=np.uint8)
+        pending_raw = np.empty(0, dtype=bool)
+        pending_data = np.empty((0, 8), dtype=np.uint8)
+        for start in range(0, case_count, chunk_rows):
+            slots = sav_slots(columns, widths, start, min(start + chunk_rows, case_count))
+            if not compress:
+                values = slots.view("<f8")[..., 0]
+                values[np.isnan(values) & numeric] = SAV_SYSMIS
+                file.write(slots.tobytes())
+                continue
+            commands, raw = sav_compress(slots, numeric)
+            pending_commands = np.concatenate((pending_commands, commands))
+            pending_raw = np.concatenate((pending_raw, raw))
+            pending_data = np.concatenate((pending_data, slots.reshape(-1, 8)))
+            # Groups of eight commands may span cases and chunks
+            whole = len(pending_commands) // 8 * 8
+            if whole:
+                file.write(sav_blocks(pending_commands[:whole], pending_raw[:whole], pending_data[:whole]))
+            pending_commands = pending_commands[whole:]
+            pending_raw = pending_raw[whole:]
+            pending_data = pending_data[whole:]
+        if len(pending_commands):
+            # Pad the last group with no-op commands
+            padding = 8 - len(pending_commands)
+            file.write(sav_blocks(
+                np.concatenate((pending_commands, np.zeros(padding, dtype=np.uint8))),
+                np.concatenate((pending_raw, np.zeros(padding, dtype=bool))),
+                np.concatenate((pending_data, np.zeros((padding, 8), dtype=np.uint8))),
+            ))
 
 def process_file(
     input_file,
@@ -43,17 +340,19 @@ def process_file(
     mapping_file,
     delete_first_column,
     cols_to_convert,
-    sheet_name
+    sheet_name,
+    changed_only=False,
+    compress_sav=False
 ):
+    # Normalized strings are only cached for one run
+    normalize_response.cache_clear()
     try:
         # Load the mapping data from the Excel file
         mapping = load_mapping(mapping_file)
         
         # Load the Excel file with the specified sheet
-        responses_df = pd.read_excel(input_file, sheet_name=sheet_name)
-
-        # Apply strip() only to string-type columns
-        responses_df = responses_df.map(lambda x: x.strip() if isinstance(x, str) else x)
+        # Whitespace is stripped from string-type columns only
+        responses_df = load_clean_sheet(input_file, sheet_name)
 
         # Copy the DataFrame and apply the replacement function to the desired rows and columns
         standardized_df = responses_df.copy()
@@ -69,111 +368,99 @@ def process_file(
             cols_to_convert = [int(col) - 1 for col in cols_to_convert if col.isdigit()]
             
 
-        # Get the headers from the filtered DataFrame
-        original_headers = standardized_df.columns.tolist()
-
-        # Number of columns in the filtered DataFrame
-        num_columns = len(original_headers)
-
-        # Generate new headers
-        new_headers = [f'Q{i+1}' for i in range(num_columns)]
-
-        # Create dictionary, numeric, number, and other columns
-        dict_column = []
-        numeric_column = []
-        number_column = []
-        zero_column = [0] * num_columns  # Column with 0 for all rows
-        eight_column = [8] * num_columns  # Column 8 with number 8 for all rows
-        empty_column_7 = [None] * num_columns  # Column 7 (1-based) empty
-        left_column = ['Left'] * num_columns  # Column 9 (1-based)
-        nominal_column = ['Nominal'] * num_columns  # Column 10 (1-based)
-        input_column = ['Input'] * num_columns  # New column with "Input"
+        # Per-column codes take precedence over the flat mapping when available
+        saved = load_codebook(
+            mapping_file,
+            lambda: showwarning(
+                "Warning",
+                "The mapping file was edited after its codebook was saved. Only the mapping file is used.",
+            ),
+        )
+        codebook, steps = saved.columns, saved.steps
 
         # Initialize max_mapping_number based on mapping file content
         max_mapping_number = max(mapping.values())
 
+        # A .sav output also carries the coded data of every column
+        writing_sav = output_file.lower().endswith(".sav")
+        sav_columns = []
+
+        # One metadata record per column, named Q1, Q2, ... in order
+        variables = []
         for idx, col in enumerate(standardized_df.columns):
+            variable = Variable(name=f'Q{idx+1}', label=str(col))
+            variables.append(variable)
             if idx in cols_to_convert:
-                dict_column.append(None)  # Set to None if excluded
-                numeric_column.append("String")  # Set "String" for excluded columns
-                number_column.append(256)  # Assign 256 for "String"
+                variable.type, variable.width = "String", 256
+                if writing_sav:
+                    values = standardized_df[col]
+                    sav_columns.append(values.where(values.notna(), "").astype(str).to_numpy(dtype=object))
+            elif changed_only and not writing_sav and saved.column_versions.get(str(col), saved.version) < saved.version:
+                continue  # Labels already set by an earlier version
+            elif is_numeric_dtype(standardized_df[col]) or is_datetime64_any_dtype(standardized_df[col]):
+                # formToNumber keeps numbers and dates as they are, so they get no value labels
+                values = standardized_df[col]
+                if is_datetime64_any_dtype(values):
+                    variable.type, variable.width = "Date", 20
+                if writing_sav:
+                    if variable.type == "Date":
+                        sav_columns.append(sav_datetimes(values))
+                    else:
+                        sav_columns.append(values.to_numpy(dtype=np.float64, na_value=np.nan))
             else:
                 col_dict = {}
+                value_codes = {}
+                entry = codebook.get(str(col))
+                # Label variants of a normalized response with the codebook's own text
+                column_mapping = {}
+                if entry is not None:
+                    for response, number in zip(entry.index, entry.tolist()):
+                        column_mapping.setdefault(response_key(response, steps), (response, number))
                 for value in standardized_df[col].dropna().unique():
-                    if value in mapping:
-                        col_dict[value] = int(mapping[value])  # Convert to int
+                    if not isinstance(value, str):
+                        continue  # Numbers in a text column are kept as they are
+                    key = response_key(value, steps)
+                    if key in column_mapping:
+                        response, number = column_mapping[key]
+                        col_dict[response] = value_codes[value] = int(number)
+                    elif value in mapping:
+                        col_dict[value] = value_codes[value] = int(mapping[value])  # Convert to int
                     else:
                         max_mapping_number += 1
-                        col_dict[value] = int(max_mapping_number)  # Convert to int
-                
-                dict_column.append(str(col_dict))  # Convert dict to string format
-                numeric_column.append("Numeric")  # Set "Numeric" for included columns
-                number_column.append(8)  # Assign 8 for "Numeric"
-
-        # Create DataFrame with the required columns and rearrange the order
-        combined_df = pd.DataFrame({
-            'Name': new_headers,
-            'Type': numeric_column,
-            'Width': number_column,
-            'Decimals': zero_column,
-            'Label': original_headers,
-            'Values': dict_column,
-            'Missing': empty_column_7,
-            'Columns': eight_column,
-            'Align': left_column,
-            'Measure': nominal_column,
-            'Role': input_column,
-        })
-
-        # Generate SPSS syntax
-        spss_syntax = []
-
-        # Start with DATA LIST command (adapt based on your actual data structure)
-        data_list_command = "DATA LIST FREE / " + " ".join(
-            f"{name} ({'A' if type_ == 'String' else 'F'}{width})" 
-            for name, type_, width in zip(combined_df['Name'], combined_df['Type'], combined_df['Width'])
-        )
-        spss_syntax.append(data_list_command + ".")
-
-        # Create VARIABLE LABELS command with each label on a separate line
-        for name, label in zip(combined_df['Name'], combined_df['Label']):
-            # Replace newline characters with a space
-            clean_label = label.replace('\n', ' ').replace('\r', '')
-            variable_labels_command = f"VARIABLE LABELS {name} \"{clean_label.replace('\'', '\'\'')}\"."
-            spss_syntax.append(variable_labels_command)
-
-        # Add VARIABLE LEVEL command
-        variable_level_command = "VARIABLE LEVEL " + " ".join(
-            f"{name} (NOMINAL)"
-            for name in combined_df['Name']
-        )
-        spss_syntax.append(variable_level_command + ".")
+                        col_dict[value] = value_codes[value] = int(max_mapping_number)  # Convert to int
+                variable.value_labels = col_dict
+
+                if writing_sav:
+                    # Text is written as the code it is labelled with, anything else as a number
+                    codes, uniques = pd.factorize(standardized_df[col])
+                    lookup = np.array(
+                        [value_codes[value] if isinstance(value, str) else sav_number(value) for value in uniques] + [np.nan],
+                        dtype=np.float64,
+                    )
+                    sav_columns.append(lookup.take(codes))
+
+        if writing_sav:
+            try:
+                # Save the coded data with its dictionary as an SPSS system file
+                write_sav(output_file, variables, sav_columns, compress_sav)
+                showinfo("Success", f"SPSS data file saved as {output_file}")
+            except PermissionError:
+                showerror(
+                    "Error",
+                    "The output file is currently open. Please close it before saving.",
+                )
+            return
 
-        # Add ALIGNMENT command for all variables
-        alignment_command = "VARIABLE ALIGNMENT " + " ".join(
-            f"{name} (LEFT)"
-            for name in combined_df['Name']
-        )
-        spss_syntax.append(alignment_command + ".")
-
-        # Add VALUE LABELS command with error handling
-        for name, values in zip(combined_df['Name'], combined_df['Values']):
-            if values and values != 'None':  # Ensure the variable name exists
-                value_labels = []
-                try:
-                    value_dict = ast.literal_eval(values)  # Try converting string to dictionary
-                    for label, value in value_dict.items():  # Swap key and value
-                        value_labels.append(f"{value} '{label}'")
-                    value_labels_command = f"VALUE LABELS {name}\n" + "\n".join(f"    {line}" for line in value_labels) + "."
-                    spss_syntax.append(value_labels_command)
-                except (ValueError, SyntaxError) as e:
-                    # Skip malformed strings or handle them
-                    showerror("Error", f"Skipping value labels for column {name}: because its already in numbers. It cant be converted.")
+        # Columns first coded in the latest version are new to the active dataset
+        new_positions = [
+            idx for idx, col in enumerate(standardized_df.columns)
+            if saved.column_created.get(str(col)) == saved.version
+        ]
 
         try:
-            # Save SPSS syntax to a file with .sps extension
+            # Write the SPSS syntax straight to a file with .sps extension
             with open(output_file, 'w', encoding='utf-8') as file:
-                file.write('\n'.join(spss_syntax))
+                write_syntax(file, variables, changed_only, new_positions)
 
             showinfo("Success", f"SPSS syntax file saved as {output_file}")
         except PermissionError:
@@ -195,6 +482,8 @@ def main():
     mapping_file = None
     sheet_name = StringVar()
     delete_first_column = BooleanVar()
+    changed_only = BooleanVar()
+    compress_sav = BooleanVar()
     cols_to_convert = StringVar()
 
     def load_input_file():
@@ -204,7 +493,7 @@ def main():
             input_label.config(text=f"Input File: {input_file}")
             # Populate sheet dropdown
             sheet_names = pd.ExcelFile(input_file).sheet_names
-            sheet_dropdown["values"] = sheet_names
+            sheet_dropdown["values"] = sheet_names + ([ALL_SHEETS] if len(sheet_names) > 1 else [])
             if sheet_names:
                 sheet_dropdown.set(sheet_names[0])  # Set default to the first sheet
 
@@ -213,7 +502,7 @@ def main():
         output_file = asksaveasfilename(
             title="Save the Output File",
             defaultextension=".sps",
-            filetypes=[("spss syntax", "*.sps"), ("All files", "*.*")],
+            filetypes=[("spss syntax", "*.sps"), ("spss data", "*.sav"), ("All files", "*.*")],
         )
         if output_file:
             output_label.config(text=f"Output File: {output_file}")
@@ -245,7 +534,8 @@ def main():
             col.strip() for col in cols_to_convert.get().split(",") if col.strip()
         ]
         process_file(
-            input_file, output_file, mapping_file, delete_first_column.get(), cols_to_convert_list, sheet_name.get()
+            input_file, output_file, mapping_file, delete_first_column.get(), cols_to_convert_list, sheet_name.get(),
+            changed_only.get(), compress_sav.get(),
         )
 
     # Create a frame to contain all widgets and add padding to the frame
@@ -295,6 +585,16 @@ def main():
     )
     delete_first_column_check.pack(pady=5)
 
+    changed_only_check = ttk.Checkbutton(
+        main_frame, text="Only Value Labels Changed in Latest Mapping", variable=changed_only
+    )
+    changed_only_check.pack(pady=5)
+
+    compress_sav_check = ttk.Checkbutton(
+        main_frame, text="Compress .sav Data", variable=compress_sav
+    )
+    compress_sav_check.pack(pady=5)
+
     Label(main_frame, text="Columns to Convert to String (comma-separated):").pack(pady=5)
     cols_to_convert_entry = ttk.Entry(main_frame, textvariable=cols_to_convert)
     cols_to_convert_entry.pack(pady=5)
@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# The scripts live in Code/ and import each other's shared helpers from there
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Code"))
+
+
+@pytest.fixture(autouse=True)
+def clean_cache(tmp_path, monkeypatch):
+    """Keep cleaned sheets cached by one test out of the user's cache directory and other tests."""
+    import common
+
+    monkeypatch.setattr(common, "CLEAN_CACHE_DIR", str(tmp_path / "clean-cache"))
+    common.CLEAN_CACHE.clear()
+    return common.CLEAN_CACHE_DIR
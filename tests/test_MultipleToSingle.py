@@ -0,0 +1,159 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import common
+import MultipleToSingle
+
+
+@pytest.fixture
+def messages(monkeypatch):
+    shown = []
+    monkeypatch.setattr(MultipleToSingle, "showinfo", lambda *args: shown.append(args))
+    monkeypatch.setattr(MultipleToSingle, "showerror", lambda *args: shown.append(args))
+    return shown
+
+
+@pytest.fixture
+def responses():
+    return pd.DataFrame({
+        "ID": [1, 2, 3, 4],
+        "Colours": ["Red; Blue", "Blue", None, "Green; Red"],
+        "Other": ["x", "y", "z", "w"],
+    })
+
+
+@pytest.mark.parametrize("text, delimiter, expected", [
+    ("a (b; (c; d)); e", ";", ("a (b; (c; d))", "e")),
+    ("x [y; z]; w", ";", ("x [y; z]", "w")),
+    # An unclosed bracket keeps the rest of the cell together
+    ("a (b; c", ";", ("a (b; c",)),
+    # A stray closing bracket does not make the depth negative
+    ("a); b", ";", ("a)", "b")),
+    ("  a ;b;  ", ";", ("a", "b", "")),
+    ("a, b (c, d), e", ",", ("a", "b (c, d)", "e")),
+    ("a; b", ",", ("a; b",)),
+])
+def test_split_cell(text, delimiter, expected):
+    assert common.split_cell(text, delimiter) == expected
+
+
+@pytest.mark.parametrize("text", ["Red; Blue", "Other (please say; why)", "a [b; c]; d (e); f", "single"])
+def test_split_cell_matches_legacy_regex(text):
+    # The lookahead regex the scripts used before the tokenizer; both agree on
+    # cells without nested or unbalanced brackets
+    legacy_pattern = re.compile(r";(?![^\(\[]*[\)\]])")
+    assert common.split_cell(text, ";") == tuple(part.strip() for part in legacy_pattern.split(text))
+
+
+def test_expand_yes_no(responses):
+    expected = pd.DataFrame({
+        "ID": [1, 2, 3, 4],
+        "Red": ["Yes", "No", "No", "Yes"],
+        "Blue": ["Yes", "Yes", "No", "No"],
+        "Green": ["No", "No", "No", "Yes"],
+        "Other": ["x", "y", "z", "w"],
+    })
+    output = common.expand_columns(responses, ["Colours", "Other"], ";")
+    pd.testing.assert_frame_equal(output, expected)
+
+
+def test_expand_numeric_formats(responses):
+    indicators = {
+        "Red": [1, 0, 0, 1],
+        "Blue": [1, 1, 0, 0],
+        "Green": [0, 0, 0, 1],
+    }
+    expected = pd.DataFrame({
+        "ID": [1, 2, 3, 4],
+        "Colours": responses["Colours"],
+        **{name: np.array(values, dtype=np.uint8) for name, values in indicators.items()},
+        "Other": ["x", "y", "z", "w"],
+    })
+    output = common.expand_columns(responses, ["Colours"], ";", "1/0", keep_original_columns=True)
+    pd.testing.assert_frame_equal(output, expected)
+
+    sparse = common.expand_columns(responses, ["Colours"], ";", "1/0 (sparse)", keep_original_columns=True)
+    assert all(isinstance(sparse[name].dtype, pd.SparseDtype) for name in indicators)
+    pd.testing.assert_frame_equal(sparse.astype({name: np.uint8 for name in indicators}), expected)
+
+
+def test_parallel_matches_serial():
+    df = pd.DataFrame({
+        "A": ["x; y", "y", "z; x (p; q)", None] * 50,
+        "B": ["1; 2; 3", "2", "3; 4", "4"] * 50,
+    })
+    profiles = [common.profile_column(df[col], ";") for col in df.columns]
+    serial = common.encode_columns(profiles, ";", False, top_k=2)
+    parallel = common.encode_columns(profiles, ";", True, top_k=2)
+    for (options, indicators, other_text), (p_options, p_indicators, p_other_text) in zip(serial, parallel):
+        assert options == p_options
+        np.testing.assert_array_equal(indicators, p_indicators)
+        np.testing.assert_array_equal(other_text, p_other_text)
+
+
+def test_cap_options_top_k(responses):
+    # Red and Blue both have two responses; the tie keeps the first to appear
+    output = common.expand_columns(responses, ["Colours"], ";", "1/0", top_k=1)
+    assert list(output.columns) == ["ID", "Red", "Other_1", "Other text", "Other"]
+    assert output["Red"].tolist() == [1, 0, 0, 1]
+    assert output["Other_1"].tolist() == [1, 1, 0, 1]
+    assert output["Other text"].tolist() == ["Blue", "Blue", None, "Green"]
+
+
+def test_cap_options_min_support(responses):
+    responses["Other text"] = "kept"
+    output = common.expand_columns(responses, ["Colours"], ";", "1/0", min_support=2)
+    assert list(output.columns) == ["ID", "Red", "Blue", "Other_1", "Other text_1", "Other", "Other text"]
+    assert output["Other_1"].tolist() == [0, 0, 0, 1]
+    assert output["Other text_1"].tolist() == [None, None, None, "Green"]
+    assert output["Other text"].tolist() == ["kept"] * 4
+
+
+def test_cap_options_joins_collapsed_responses():
+    options = ["a", "b", "c"]
+    codes = np.array([0, 1, 0])
+    uniques = np.array(["a; b; c", "a"], dtype=object)
+    unique_index = np.array([0, 0, 0, 1])
+    option_index = np.array([0, 1, 2, 0])
+
+    kept, new_index, other_text = common.cap_options(options, codes, uniques, unique_index, option_index, ";", top_k=1)
+    assert kept == ["a", "Other"]
+    assert new_index.tolist() == [0, 1, 1, 0]
+    assert other_text.tolist() == ["b; c", None, None]
+
+    # Nothing falls below the limits
+    assert common.cap_options(options, codes, uniques, unique_index, option_index, ";", min_support=0)[2] is None
+
+
+def test_process_file(tmp_path, messages, responses):
+    input_file = tmp_path / "responses.xlsx"
+    responses.to_excel(input_file, index=False)
+    output_file = tmp_path / "output.xlsx"
+
+    MultipleToSingle.process_file(str(input_file), str(output_file), ["1"], False, "Sheet1", "1/0")
+    assert messages[-1][0] == "Success"
+    output = pd.read_excel(output_file)
+    assert list(output.columns) == ["ID", "Red", "Blue", "Green", "Other"]
+    assert output["Green"].tolist() == [0, 0, 0, 1]
+
+    MultipleToSingle.process_file(str(input_file), str(output_file), [], False, "Sheet1", "1/0", top_k="0")
+    assert messages[-1][0] == "Error"
+
+
+def test_process_file_shards_long_output(tmp_path, messages, responses, monkeypatch):
+    # Three data rows per sheet instead of Excel's limit
+    monkeypatch.setattr(common, "EXCEL_MAX_ROWS", 4)
+    input_file = tmp_path / "responses.xlsx"
+    responses.to_excel(input_file, index=False)
+    output_file = tmp_path / "output.xlsx"
+
+    MultipleToSingle.process_file(str(input_file), str(output_file), ["1"], False, "Sheet1", "1/0")
+    assert messages[-1][0] == "Success"
+    assert pd.ExcelFile(output_file).sheet_names == ["Sheet1", "Sheet2"]
+    output = common.read_sheet(output_file, common.ALL_SHEETS)
+    assert list(output.columns) == ["ID", "Red", "Blue", "Green", "Other"]
+    assert output["ID"].tolist() == [1, 2, 3, 4]
+    assert output["Red"].tolist() == [1, 0, 0, 1]
@@ -0,0 +1,102 @@
+import io
+import os
+from datetime import datetime
+
+from openpyxl import Workbook, load_workbook
+
+import csvToExcel
+
+
+def sheet_values(path):
+    wb = load_workbook(path, read_only=True)
+    return {ws.title: [list(row) for row in ws.iter_rows(values_only=True)] for ws in wb.worksheets}
+
+
+def test_incremental_appends_new_sheets(tmp_path):
+    input_file = tmp_path / "data.csv"
+    output_file = str(tmp_path / "data.xlsx")
+    input_file.write_text("n,day\n1,2024-01-01\n2,\n")
+    assert csvToExcel.incremental_write_excel(str(input_file), output_file, 2, True) == (2, True)
+
+    with open(input_file, "a") as csvfile:
+        csvfile.write("3,2024-01-03\n4,\n5,2024-01-05\n")
+    assert csvToExcel.incremental_write_excel(str(input_file), output_file, 2, True) == (3, False)
+
+    assert sheet_values(output_file) == {
+        "Sheet1": [["n", "day"], [1, datetime(2024, 1, 1)], [2]],
+        "Sheet2": [["n", "day"], [3, datetime(2024, 1, 3)], [4]],
+        "Sheet3": [["n", "day"], [5, datetime(2024, 1, 5)]],
+    }
+    assert load_workbook(output_file)["Sheet3"]["B2"].number_format == "yyyy-mm-dd h:mm:ss"
+
+
+def test_incremental_fills_last_sheet(tmp_path):
+    input_file = tmp_path / "data.csv"
+    output_file = str(tmp_path / "data.xlsx")
+    input_file.write_text("n,name\n1,a\n")
+    csvToExcel.incremental_write_excel(str(input_file), output_file)
+
+    # Three small refreshes all land on the one sheet
+    for n, name in ((2, "b"), (3, "c"), (4, "d")):
+        with open(input_file, "a") as csvfile:
+            csvfile.write(f"{n},{name}\n")
+        assert csvToExcel.incremental_write_excel(str(input_file), output_file) == (1, False)
+
+    assert sheet_values(output_file) == {
+        "Sheet1": [["n", "name"], ["1", "a"], ["2", "b"], ["3", "c"], ["4", "d"]],
+    }
+    ws = load_workbook(output_file)["Sheet1"]
+    assert [ws.cell(row=row, column=1).coordinate for row in (4, 5)] == ["A4", "A5"]
+
+
+def test_incremental_continues_on_new_sheet_when_full(tmp_path):
+    input_file = tmp_path / "data.csv"
+    output_file = str(tmp_path / "data.xlsx")
+    input_file.write_text("n\n1\n")
+    csvToExcel.incremental_write_excel(str(input_file), output_file, 3)
+
+    with open(input_file, "a") as csvfile:
+        csvfile.write("2\n3\n4\n")
+    assert csvToExcel.incremental_write_excel(str(input_file), output_file, 3) == (3, False)
+    with open(input_file, "a") as csvfile:
+        csvfile.write("5\n")
+    assert csvToExcel.incremental_write_excel(str(input_file), output_file, 3) == (1, False)
+
+    assert sheet_values(output_file) == {
+        "Sheet1": [["n"], ["1"], ["2"], ["3"]],
+        "Sheet2": [["n"], ["4"], ["5"]],
+    }
+
+
+def test_splice_rows_updates_dimension():
+    sheet = (
+        b'<worksheet><dimension ref="A1:B2" /><sheetData><row r="1"><c r="A1" /></row>'
+        b'<row r="2"><c r="A2" /></row></sheetData><pageMargins /></worksheet>'
+    )
+    rows_xml = csvToExcel.renumber_rows(b'<sheetData><row r="1"><c r="A1" /><c r="B1" /></row></sheetData>', 2)
+    target = io.BytesIO()
+
+    csvToExcel.splice_rows(io.BytesIO(sheet), target, rows_xml, 3)
+    assert target.getvalue() == (
+        b'<worksheet><dimension ref="A1:B3" /><sheetData><row r="1"><c r="A1" /></row>'
+        b'<row r="2"><c r="A2" /></row><row r="3"><c r="A3" /><c r="B3" /></row></sheetData>'
+        b'<pageMargins /></worksheet>'
+    )
+
+
+def test_incremental_rebuilds_edited_workbook(tmp_path):
+    input_file = tmp_path / "data.csv"
+    output_file = str(tmp_path / "data.xlsx")
+    input_file.write_text("a\nx\n")
+    csvToExcel.incremental_write_excel(str(input_file), output_file)
+
+    # Saved again outside the converter, e.g. by Excel
+    wb = Workbook()
+    wb.active.append(["edited"])
+    wb.save(output_file)
+    os.utime(output_file, ns=(0, 0))
+    with open(input_file, "a") as csvfile:
+        csvfile.write("y\n")
+
+    assert csvToExcel.incremental_write_excel(str(input_file), output_file) == (2, True)
+    assert sheet_values(output_file) == {"Sheet1": [["a"], ["x"], ["y"]]}
@@ -0,0 +1,173 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import common
+import formToNumber
+
+
+@pytest.fixture
+def messages(monkeypatch):
+    shown = []
+    monkeypatch.setattr(formToNumber, "showinfo", lambda *args: shown.append(args))
+    monkeypatch.setattr(formToNumber, "showerror", lambda *args: shown.append(args))
+    monkeypatch.setattr(formToNumber, "showwarning", lambda *args: shown.append(args))
+    return shown
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_blank_column(tmp_path, messages, streaming):
+    input_file = tmp_path / "responses.xlsx"
+    pd.DataFrame({
+        "Choice": ["Yes", " No ", "Yes", "No"],
+        "Optional": [None, None, None, None],
+    }).to_excel(input_file, index=False)
+    mapping_file = tmp_path / "mapping.xlsx"
+    pd.DataFrame([["Yes", 1], ["No", 0]]).to_excel(mapping_file, header=False, index=False)
+    output_file = tmp_path / "output.xlsx"
+
+    formToNumber.process_file(
+        str(input_file), str(output_file), str(mapping_file), [], False, "Sheet1", streaming, 2
+    )
+
+    assert messages[-1][0] == "Success"
+    output = pd.read_excel(output_file)
+    assert output["Choice"].tolist() == [1, 0, 1, 0]
+    assert output["Optional"].isna().all()
+
+
+def test_edited_mapping_overrides_codebook(tmp_path, messages, monkeypatch):
+    import autoMapping
+
+    monkeypatch.setattr(autoMapping, "showinfo", lambda *args: None)
+    input_file = tmp_path / "responses.xlsx"
+    pd.DataFrame({"Opinion": ["Agree", "Disagree", "Agree"]}).to_excel(input_file, index=False)
+    mapping_file = tmp_path / "mapping.xlsx"
+    autoMapping.process_file(str(input_file), str(mapping_file), [], "Sheet1")
+    output_file = tmp_path / "output.xlsx"
+
+    formToNumber.process_file(str(input_file), str(output_file), str(mapping_file), [], False, "Sheet1")
+    assert pd.read_excel(output_file)["Opinion"].tolist() == [1, 2, 1]
+
+    # Editing the mapping by hand takes effect, with a warning that the codebook is ignored
+    pd.DataFrame([["Agree", 5], ["Disagree", 2]]).to_excel(mapping_file, header=False, index=False)
+    formToNumber.process_file(str(input_file), str(output_file), str(mapping_file), [], False, "Sheet1")
+    assert pd.read_excel(output_file)["Opinion"].tolist() == [5, 2, 5]
+    assert messages[-2][0] == "Warning"
+
+
+@pytest.fixture
+def excel_reads(monkeypatch):
+    """Count the mapping files actually parsed, as opposed to taken from the .mapcache sidecar."""
+    reads = []
+    read_excel = pd.read_excel
+
+    def counting_read_excel(*args, **kwargs):
+        reads.append(args[0])
+        return read_excel(*args, **kwargs)
+
+    monkeypatch.setattr(pd, "read_excel", counting_read_excel)
+    return reads
+
+
+def test_mapping_cache_invalidation(tmp_path, excel_reads):
+    mapping_file = tmp_path / "mapping.xlsx"
+    pd.DataFrame([["Yes", 1], ["No", 0]]).to_excel(mapping_file, header=False, index=False)
+    assert common.load_mapping(str(mapping_file)) == {"Yes": 1, "No": 0}
+    assert len(excel_reads) == 1
+
+    # Same size and modification time: taken from the cache
+    assert common.load_mapping(str(mapping_file)) == {"Yes": 1, "No": 0}
+    assert len(excel_reads) == 1
+
+    # Touched but unchanged: the hash matches, so still no parse
+    os.utime(mapping_file, ns=(0, 0))
+    assert common.load_mapping(str(mapping_file)) == {"Yes": 1, "No": 0}
+    assert len(excel_reads) == 1
+
+    # Changed contents are read again
+    pd.DataFrame([["Yes", 2], ["No", 0]]).to_excel(mapping_file, header=False, index=False)
+    assert common.load_mapping(str(mapping_file)) == {"Yes": 2, "No": 0}
+    assert len(excel_reads) == 2
+
+    # A sidecar moved along with its file belongs to another path
+    moved_dir = tmp_path / "moved"
+    moved_dir.mkdir()
+    moved_file = moved_dir / "mapping.xlsx"
+    shutil.copy2(mapping_file, moved_file)
+    shutil.copy2(str(mapping_file) + common.MAPPING_CACHE_SUFFIX, str(moved_file) + common.MAPPING_CACHE_SUFFIX)
+    assert common.load_mapping(str(moved_file)) == {"Yes": 2, "No": 0}
+    assert len(excel_reads) == 3
+
+
+def test_mapping_cache_skips_unsupported_keys(tmp_path, excel_reads):
+    mapping_file = tmp_path / "mapping.xlsx"
+    pd.DataFrame([[pd.Timestamp("2024-01-01"), 1]]).to_excel(mapping_file, header=False, index=False)
+
+    # marshal cannot store timestamps, so there is no sidecar and every load parses the file
+    for reads in (1, 2):
+        assert common.load_mapping(str(mapping_file)) == {pd.Timestamp("2024-01-01"): 1}
+        assert len(excel_reads) == reads
+    assert not os.path.exists(str(mapping_file) + common.MAPPING_CACHE_SUFFIX)
+
+
+def test_edited_mapping_rebuilds_cache(tmp_path, messages):
+    input_file = tmp_path / "responses.xlsx"
+    pd.DataFrame({"Choice": ["Yes", "No", "Yes"]}).to_excel(input_file, index=False)
+    mapping_file = tmp_path / "mapping.xlsx"
+    pd.DataFrame([["Yes", 1], ["No", 0]]).to_excel(mapping_file, header=False, index=False)
+    output_file = tmp_path / "output.xlsx"
+
+    formToNumber.process_file(str(input_file), str(output_file), str(mapping_file), [], False, "Sheet1")
+    assert pd.read_excel(output_file)["Choice"].tolist() == [1, 0, 1]
+    assert os.path.exists(str(mapping_file) + common.MAPPING_CACHE_SUFFIX)
+
+    pd.DataFrame([["Yes", 7], ["No", 3]]).to_excel(mapping_file, header=False, index=False)
+    formToNumber.process_file(str(input_file), str(output_file), str(mapping_file), [], False, "Sheet1")
+    assert messages[-1][0] == "Success"
+    assert pd.read_excel(output_file)["Choice"].tolist() == [7, 3, 7]
+
+
+def test_long_output_continues_on_new_sheets(tmp_path, messages, monkeypatch):
+    # Two data rows per sheet instead of Excel's limit
+    monkeypatch.setattr(common, "EXCEL_MAX_ROWS", 3)
+    input_file = tmp_path / "responses.xlsx"
+    pd.DataFrame({"Choice": ["Yes", "No", "Yes", "No", "Yes"]}).to_excel(input_file, index=False)
+    mapping_file = tmp_path / "mapping.xlsx"
+    pd.DataFrame([["Yes", 1], ["No", 0]]).to_excel(mapping_file, header=False, index=False)
+    output_file = tmp_path / "output.xlsx"
+
+    formToNumber.process_file(str(input_file), str(output_file), str(mapping_file), [], False, "Sheet1")
+    assert messages[-1][0] == "Success"
+    assert pd.ExcelFile(output_file).sheet_names == ["Sheet1", "Sheet2", "Sheet3"]
+    assert common.read_sheet(output_file, common.ALL_SHEETS)["Choice"].tolist() == [1, 0, 1, 0, 1]
+
+
+def test_cleaned_sheet_shared_with_next_step(tmp_path, messages, excel_reads, monkeypatch):
+    import formToSPSS
+
+    monkeypatch.setattr(formToSPSS, "showinfo", lambda *args: messages.append(args))
+    input_file = tmp_path / "responses.xlsx"
+    pd.DataFrame({"Choice": [" Yes", "No ", "Yes"], "Age": [20, 30, 40]}).to_excel(input_file, index=False)
+    mapping_file = tmp_path / "mapping.xlsx"
+    pd.DataFrame([["Yes", 1], ["No", 0]]).to_excel(mapping_file, header=False, index=False)
+
+    formToNumber.process_file(str(input_file), str(tmp_path / "output.xlsx"), str(mapping_file), [], False, "Sheet1")
+    assert excel_reads.count(str(input_file)) == 1
+
+    # formToSPSS runs as a separate program, with nothing cached in memory
+    common.CLEAN_CACHE.clear()
+    formToSPSS.process_file(str(input_file), str(tmp_path / "output.sps"), str(mapping_file), False, [], "Sheet1")
+    assert messages[-1][0] == "Success"
+    assert excel_reads.count(str(input_file)) == 1
+
+    # Touched but unchanged is still a hit; changed contents are read and cleaned again
+    common.CLEAN_CACHE.clear()
+    os.utime(input_file, ns=(0, 0))
+    assert common.load_clean_sheet(str(input_file), "Sheet1")["Choice"].tolist() == ["Yes", "No", "Yes"]
+    assert excel_reads.count(str(input_file)) == 1
+    pd.DataFrame({"Choice": [" Maybe"], "Age": [50]}).to_excel(input_file, index=False)
+    assert common.load_clean_sheet(str(input_file), "Sheet1")["Choice"].tolist() == ["Maybe"]
+    assert excel_reads.count(str(input_file)) == 2
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import formToSPSS
+
+
+@pytest.fixture
+def form_files(tmp_path, monkeypatch):
+    """A small response sheet with text, numeric and date columns, and its mapping."""
+    messages = []
+    monkeypatch.setattr(formToSPSS, "showinfo", lambda *args: messages.append(args))
+    monkeypatch.setattr(formToSPSS, "showerror", lambda *args: messages.append(args))
+    monkeypatch.setattr(formToSPSS, "showwarning", lambda *args: messages.append(args))
+    responses = pd.DataFrame({
+        "Choice": ["Yes", "Maybe", "No", None, "Yes"],
+        "Age": [25, 30, 41, np.nan, 30],
+        "When": pd.to_datetime(["2024-01-05 10:30", "2024-02-01 00:00", None, "2024-03-15 08:00", "2024-01-05 10:30"]),
+        "Name": ["Sara", "Ali", "Bob", "Ali", None],
+    })
+    input_file = tmp_path / "responses.xlsx"
+    responses.to_excel(input_file, index=False)
+    # Yes and Maybe share a code, as autoMapping produces for new responses
+    mapping_file = tmp_path / "mapping.xlsx"
+    pd.DataFrame([["Yes", 1], ["No", 0], ["Maybe", 1]]).to_excel(mapping_file, header=False, index=False)
+    return str(input_file), str(mapping_file), responses, messages
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_sav_round_trip(tmp_path, form_files, compress):
+    pyreadstat = pytest.importorskip("pyreadstat")
+    input_file, mapping_file, responses, messages = form_files
+    output_file = str(tmp_path / "output.sav")
+
+    formToSPSS.process_file(input_file, output_file, mapping_file, False, ["4"], "Sheet1", False, compress)
+    assert messages[-1][0] == "Success"
+
+    df, meta = pyreadstat.read_sav(output_file)
+    assert list(df.columns) == ["Q1", "Q2", "Q3", "Q4"]
+    assert meta.column_labels == ["Choice", "Age", "When", "Name"]
+
+    # Text is coded, and a code given twice is labelled like in the .sps output
+    assert df["Q1"].tolist()[:3] == [1, 1, 0]
+    assert np.isnan(df["Q1"][3])
+    assert meta.variable_value_labels["Q1"] == {0: "No", 1: "Maybe"}
+
+    # Numbers and dates keep their values and get no value labels
+    assert df["Q2"].tolist()[:3] == [25, 30, 41]
+    assert "Q2" not in meta.variable_value_labels
+    assert pd.Series(df["Q3"]).tolist()[:2] == responses["When"].tolist()[:2]
+    assert pd.isna(df["Q3"][2])
+    assert meta.original_variable_types["Q3"].startswith("DATETIME")
+
+    # Columns converted to string stay text
+    assert df["Q4"].tolist() == ["Sara", "Ali", "Bob", "Ali", ""]
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_write_sav_chunks(tmp_path, compress):
+    pyreadstat = pytest.importorskip("pyreadstat")
+    output_file = str(tmp_path / "chunks.sav")
+    numbers = np.array([1, -150, 2.5, np.nan, 1e12, 151, 0] * 3)
+    text = np.array(["", "a longer text value", "ñ", "x" * 300, "b", "", "c"] * 3, dtype=object)
+    variables = [
+        formToSPSS.Variable(name="Q1", label="Number", value_labels={"One": 1}),
+        formToSPSS.Variable(name="Q2", label="Text", type="String", width=256),
+    ]
+
+    formToSPSS.write_sav(output_file, variables, [numbers, text], compress, chunk_rows=4)
+
+    df, meta = pyreadstat.read_sav(output_file)
+    np.testing.assert_array_equal(df["Q1"].to_numpy(), numbers)
+    assert df["Q2"].tolist() == [value[:255] for value in text]
+    assert meta.variable_value_labels == {"Q1": {1: "One"}}
+
+
+def test_sps_labels_text_columns_only(tmp_path, form_files):
+    input_file, mapping_file, _, messages = form_files
+    output_file = tmp_path / "output.sps"
+
+    formToSPSS.process_file(input_file, str(output_file), mapping_file, False, ["4"], "Sheet1")
+    assert messages[-1][0] == "Success"
+
+    syntax = output_file.read_text(encoding="utf-8")
+    assert "Q1 TO Q2 (F8)\n    Q3 (DATETIME20)\n    Q4 (A256)." in syntax
+    assert "VALUE LABELS Q1\n    0 'No'\n    1 'Maybe'.\n" in syntax
+    # Numeric and date columns keep their values in formToNumber, so they get no labels
+    assert syntax.count("VALUE LABELS") == 1
+
+
+def test_changed_only_keeps_dataset(tmp_path, form_files, monkeypatch):
+    import autoMapping
+
+    monkeypatch.setattr(autoMapping, "showinfo", lambda *args: None)
+    _, _, _, messages = form_files
+    first = tmp_path / "first.xlsx"
+    pd.DataFrame({"Choice": ["Yes", "No"], "Colour": ["Red", "Blue"]}).to_excel(first, index=False)
+    second = tmp_path / "second.xlsx"
+    pd.DataFrame({
+        "Choice": ["Yes", "No", "Yes"],
+        "Colour": ["Red", "Blue", "Green"],
+        "Fruit": ["Kiwi", "Apple", "Kiwi"],
+    }).to_excel(second, index=False)
+    mapping_file = str(tmp_path / "codes.xlsx")
+    autoMapping.process_file(str(first), mapping_file, [], "Sheet1")
+    autoMapping.process_file(str(second), mapping_file, [], "Sheet1", True)
+    output_file = tmp_path / "changed.sps"
+
+    formToSPSS.process_file(str(second), str(output_file), mapping_file, False, [], "Sheet1", True)
+    assert messages[-1][0] == "Success"
+
+    syntax = output_file.read_text(encoding="utf-8")
+    # DATA LIST would start a new dataset and drop the labels already set
+    assert "DATA LIST" not in syntax
+    assert syntax.startswith('NUMERIC Q3 (F8).\nVARIABLE LABELS Q3 "Fruit".\n')
+    assert "ADD VALUE LABELS Q2\n" in syntax
+    assert "ADD VALUE LABELS Q3\n" in syntax
+    assert "Q1" not in syntax